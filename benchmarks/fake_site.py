@@ -0,0 +1,104 @@
+import os
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+SENTENCES = [
+    "今天的新闻报道，中国经济市场继续增长。",
+    "政府宣布新的政策，人民生活水平不断提高！",
+    "专家表示，未来几年的发展仍然面临挑战；",
+    "The market reacted calmly to the announcement.",
+    "记者从有关部门了解到，相关工作正在推进中。",
+    "世界各国都在关注这一事件的后续发展？",
+]
+
+def article_html(index, chars=1500, page=1, pages=1):
+    """A page shaped like a Wenxuecity article: chrome, read counter, body.
+
+    Articles of several pages link each page to the next with 下一页.
+    """
+    body = []
+    length = 0
+    i = index + (page - 1) * 7  # Vary the text from page to page
+    while length < chars:
+        sentence = SENTENCES[i % len(SENTENCES)]
+        body.append(sentence)
+        length += len(sentence)
+        i += 1
+    return (
+        "<html><head><title>新闻</title><script>var x = 1;</script></head><body>"
+        "<header>文学城</header><nav>首页 新闻</nav>"
+        f"<div class='article'><h1>新闻标题 {index}</h1><p>被阅读次数 A-AA+ 123</p>"
+        + "".join(f"<p>{sentence}</p>" for sentence in body)
+        + (f"<div class='pages'><a href='{index}_{page + 1}.html'>下一页</a></div>" if page < pages else "")
+        + "</div><footer>版权所有</footer></body></html>"
+    )
+
+def homepage_html(count):
+    links = "".join(
+        f"<li><a href='/news/2024/01/01/{i}.html'>第{i}条新闻 标题 {i}</a></li>"
+        for i in range(1, count + 1)
+    )
+    return f"<html><body><div class='maincontent'><ul>{links}</ul></div></body></html>"
+
+class FakeWenxuecity:
+    """Local stand-in for www.wenxuecity.com.
+
+    Serves recorded pages from fixtures_dir when given (index.html for the
+    homepage, news/... for articles), otherwise generated ones.
+    """
+
+    def __init__(self, articles=5, article_chars=1500, latency=0.05, fixtures_dir=None, pages=1):
+        self.articles = articles
+        self.pages = pages
+        self.article_chars = article_chars
+        self.latency = latency
+        self.fixtures_dir = fixtures_dir
+        self.requests = 0
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                site.requests += 1
+                time.sleep(site.latency)
+                body = site.page(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def page(self, path):
+        if self.fixtures_dir:
+            name = 'index.html' if path == '/' else path.lstrip('/')
+            try:
+                with open(os.path.join(self.fixtures_dir, name), encoding='utf-8') as f:
+                    return f.read()
+            except OSError:
+                return None
+        if path == '/':
+            return homepage_html(self.articles)
+        if path.startswith('/news/') and path.endswith('.html'):
+            index, _, page = path.rsplit('/', 1)[1][:-len('.html')].partition('_')
+            page = int(page or 1)
+            if page > self.pages:
+                return None
+            return article_html(int(index), self.article_chars, page, self.pages)
+        return None
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
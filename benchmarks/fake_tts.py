@@ -0,0 +1,25 @@
+import time
+from src.audio_player import NullSink
+
+class GapRecordingSink(NullSink):
+    """Real-time null sink that records when output ran dry and for how long"""
+
+    def __init__(self):
+        super().__init__(realtime=True)
+        self.reset()
+
+    def reset(self):
+        self.first_write = None
+        self.drain_at = None
+        self.write_times = []
+        self.gaps = []  # (time the gap ended, gap seconds)
+
+    def write(self, pcm):
+        now = time.monotonic()
+        self.write_times.append(now)
+        if self.first_write is None:
+            self.first_write = now
+        elif self.drain_at is not None and now > self.drain_at:
+            self.gaps.append((now, now - self.drain_at))
+        super().write(pcm)
+        self.drain_at = time.monotonic() + (self.frames_written - self.frames_played) / self.sample_rate
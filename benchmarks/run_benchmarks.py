@@ -0,0 +1,278 @@
+"""Offline benchmark for the reading pipeline.
+
+Serves generated (or recorded) Wenxuecity pages from a local HTTP server,
+replaces gTTS with a fake backend of fixed latency and plays into a null
+sink, then reports time-to-first-audio, gaps, parse time and the RSS
+(at the start, peak and end of each stage, sampled while it runs) of
+get_wenxuecity_news, process_and_speak and SpeakingThread, and the GUI's
+startup phases from a fresh process with and without a saved news list.
+
+    python benchmarks/run_benchmarks.py --tts-latency 0.3 --articles 3
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from benchmarks.fake_site import FakeWenxuecity
+
+def summarize(values):
+    if not values:
+        return {'count': 0}
+    ordered = sorted(values)
+    return {
+        'count': len(ordered),
+        'mean': statistics.mean(ordered),
+        'p50': ordered[len(ordered) // 2],
+        'max': ordered[-1],
+    }
+
+class RssSampler:
+    """RSS of this process over one stage: at its start, its peak, and at its end.
+
+    The process-wide peak (ru_maxrss) never goes down, so it would charge
+    each stage with every earlier one; sampling while the stage runs does not.
+    """
+
+    def __init__(self, interval=0.01):
+        from src.process_stats import current_rss_mb
+        self.current_rss_mb = current_rss_mb
+        self.interval = interval
+        self.start = self.peak = current_rss_mb() or 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name='rss-sampler', daemon=True)
+        self._thread.start()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.current_rss_mb() or 0.0)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        end = self.current_rss_mb() or 0.0
+        return {'start': self.start, 'peak': max(self.peak, end), 'end': end}
+
+def install_fakes(args):
+    """Swap in the fake TTS backend and a gap-recording null sink"""
+    import src.text_to_speech_online as tts
+    from src.audio_player import PlaybackEngine
+    from src.tts_backends import get_backend
+    from benchmarks.fake_tts import GapRecordingSink
+
+    fake = get_backend('fake')
+    fake.latency = args.tts_latency
+    fake.seconds_per_char = args.seconds_per_char
+    sink = GapRecordingSink()
+    tts._playback_engine = PlaybackEngine(sink)
+    return sink
+
+def bench_news_list(args):
+    from src.wxc_news_list import get_wenxuecity_news
+    from src.article_extractor import parse_article
+    from src.http_client import fetch_text
+    rss = RssSampler()
+    started = time.perf_counter()
+    articles = get_wenxuecity_news()
+    list_seconds = time.perf_counter() - started
+
+    fetch_times, parse_times = [], []
+    for article in articles[:args.articles]:
+        started = time.perf_counter()
+        html = fetch_text(article['url'])
+        fetch_times.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        parse_article(article['url'], html, args.chars_limit)
+        parse_times.append(time.perf_counter() - started)
+
+    return articles, {
+        'articles': len(articles),
+        'news_list_seconds': list_seconds,
+        'article_fetch_seconds': summarize(fetch_times),
+        'article_parse_seconds': summarize(parse_times),
+        'rss_mb': rss.stop(),
+    }
+
+def bench_speaking_thread(args, articles, sink):
+    from src.article_extractor import fetch_article
+    from src.wxc_gui import SpeakingThread
+    from src.tts_backends import get_backend
+
+    rss = RssSampler()
+    segments = list(fetch_article(articles[0]['url'], args.chars_limit))
+    sink.reset()
+    fake = get_backend('fake')
+    requests_before = fake.requests
+
+    thread = SpeakingThread(segments)
+    started = time.monotonic()
+    thread.run()  # Synchronously, on this thread
+    elapsed = time.monotonic() - started
+
+    return {
+        'segments': len(segments),
+        'tts_requests': fake.requests - requests_before,
+        'time_to_first_audio': sink.first_write - started if sink.first_write else None,
+        'inter_segment_gap': summarize([gap for _, gap in sink.gaps]),
+        'total_seconds': elapsed,
+        'rss_mb': rss.stop(),
+    }
+
+def bench_gui(args, sink):
+    """Read the first articles through MainWindow with Auto Continue on"""
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QTimer
+    import src.wxc_gui as gui
+
+    rss = RssSampler()
+    app = QApplication.instance() or QApplication([])
+    window = gui.MainWindow()
+    window.chars_input.setText(str(args.chars_limit))
+    finished, started = [], []
+
+    # Instance attributes shadow the methods, so the signal connections and
+    # Auto Continue made inside MainWindow go through these wrappers
+    handle_speech_finished = window.handle_speech_finished
+    def finished_wrapper():
+        finished.append(time.monotonic())
+        handle_speech_finished()
+    window.handle_speech_finished = finished_wrapper
+
+    process_and_speak = window.process_and_speak
+    def process_wrapper():
+        started.append(time.monotonic())
+        process_and_speak()
+    window.process_and_speak = process_wrapper
+
+    # Wait for the live refresh too: it would append the articles trimmed below
+    deadline = time.monotonic() + args.timeout
+    while ((not window.news_articles or 'news_refreshed' not in gui.startup_times)
+           and time.monotonic() < deadline):
+        app.processEvents()
+        time.sleep(0.01)
+
+    count = min(args.articles, len(window.news_articles))
+    window.news_articles = window.news_articles[:count]
+    window.current_news_index = 0
+    window.url_input.setText(window.news_articles[0]['url'])
+    sink.reset()
+    window.process_and_speak()
+
+    def check_done():
+        if len(finished) >= count or time.monotonic() > deadline:
+            app.quit()
+    timer = QTimer()
+    timer.timeout.connect(check_done)
+    timer.start(50)
+    app.exec_()
+    timer.stop()
+
+    # Silence from one article finishing until the next one's body starts
+    # playing (the title announcement in between counts as audio)
+    windows = []
+    for done_at, next_start in zip(finished, started[1:]):
+        body_start = next((t for t in sink.write_times if t > next_start), None)
+        if body_start is not None:
+            windows.append((done_at, body_start))
+    in_window = lambda ended, window: window[0] < ended <= window[1]
+    transitions = [sum(gap for ended, gap in sink.gaps if in_window(ended, window)) for window in windows]
+    inter_segment = [gap for ended, gap in sink.gaps
+                     if not any(in_window(ended, window) for window in windows)]
+
+    return {
+        'articles_read': len(finished),
+        'time_to_first_audio': sink.first_write - started[0] if sink.first_write else None,
+        'inter_segment_gap': summarize(inter_segment),
+        'article_transition_gap': summarize(transitions),
+        'rss_mb': rss.stop(),
+    }
+
+# Launches the GUI in a fresh interpreter and prints its startup phases
+COLD_START_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+from PyQt5.QtWidgets import QApplication
+import src.wxc_gui as gui
+app = QApplication([])
+window = gui.MainWindow()
+window.show()
+deadline = time.monotonic() + {timeout}
+while ('window' not in gui.startup_times or 'news_list' not in gui.startup_times) and time.monotonic() < deadline:
+    app.processEvents()
+    time.sleep(0.005)
+print(json.dumps(gui.startup_times))
+"""
+
+def bench_cold_start(args):
+    """Startup phases of a fresh GUI process, in milliseconds"""
+    script = COLD_START_SCRIPT.format(root=project_root, timeout=args.timeout)
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True,
+                            timeout=args.timeout + 30)
+    process_seconds = time.perf_counter() - started
+    lines = result.stdout.strip().splitlines()
+    if result.returncode or not lines:
+        return {'error': result.stderr.strip()[-500:]}
+    phases = json.loads(lines[-1])
+    report = {phase: round(seconds * 1000, 1) for phase, seconds in phases.items()}
+    report['process_total'] = round(process_seconds * 1000, 1)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the reading pipeline")
+    parser.add_argument('--articles', type=int, default=2, help="Articles read through the GUI")
+    parser.add_argument('--article-chars', type=int, default=1500)
+    parser.add_argument('--chars-limit', type=int, default=500, help="0 reads whole articles")
+    parser.add_argument('--pages', type=int, default=1, help="Pages per generated article")
+    parser.add_argument('--server-latency', type=float, default=0.05)
+    parser.add_argument('--tts-latency', type=float, default=0.3, help="Seconds per fake TTS request")
+    parser.add_argument('--seconds-per-char', type=float, default=0.05,
+                        help="Fake audio length per character (the run plays in real time)")
+    parser.add_argument('--backend', default='fake', help="TTS backend to measure (fake, espeak, gtts)")
+    parser.add_argument('--fixtures', help="Directory of recorded pages (index.html, news/...)")
+    parser.add_argument('--timeout', type=float, default=300)
+    parser.add_argument('--output', help="Also write the JSON report here")
+    args = parser.parse_args()
+
+    site = FakeWenxuecity(max(args.articles, 5), args.article_chars,
+                          args.server_latency, args.fixtures, args.pages).start()
+    # Must be set before any src module reads its configuration
+    os.environ['WXC_BASE_URL'] = site.base_url
+    os.environ['CACHE_DIR'] = tempfile.mkdtemp(prefix='wxc-bench-')
+    os.environ['WXC_TTS_BACKEND'] = args.backend
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    # Generated articles cycle through the same sentences, so they would all
+    # count as one story and Auto Continue would skip them
+    os.environ.setdefault('WXC_NEAR_DUP_SKIP', '0')
+
+    report = {'config': vars(args)}
+    # Before anything is cached the list has to come from the (fake) site
+    report['cold_start_no_saved_list'] = bench_cold_start(args)
+    report['cold_start_saved_list'] = bench_cold_start(args)
+
+    sink = install_fakes(args)
+    articles, report['get_wenxuecity_news'] = bench_news_list(args)
+    report['SpeakingThread'] = bench_speaking_thread(args, articles, sink)
+    # A fresh audio cache keeps the GUI run from hitting audio cached above
+    import src.text_to_speech_online as tts
+    from src.audio_cache import AudioCache
+    tts._audio_cache = AudioCache(tempfile.mkdtemp(prefix='wxc-bench-audio-'), tts.get_audio_cache().max_bytes)
+    report['process_and_speak'] = bench_gui(args, sink)
+    report['server_requests'] = site.requests
+    site.stop()
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
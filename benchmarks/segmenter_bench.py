@@ -0,0 +1,116 @@
+"""Compare the old punctuation regex with src.segmenter on sample articles.
+
+For each segmenter it reports segment lengths, the synthesis batches and
+gTTS requests they turn into (counted with gTTS's own tokenizer, as it
+splits text longer than one request), and a modelled request latency
+distribution (fixed cost per request plus a cost per character).
+
+    python benchmarks/segmenter_bench.py --fixtures recorded_pages/
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from gtts import gTTS
+from benchmarks.fake_site import article_html
+from src.article_extractor import extract_main_text
+from src.segment_batcher import batch_segments
+from src.segmenter import segment_text, script_of
+from src.tts_backends import batch_chars
+
+LEGACY_PATTERN = re.compile(r'[^。！？，；：、]+[。！？，；：、]?')
+
+ENGLISH_SAMPLE = (
+    "The market reacted calmly to the announcement. Analysts at the U.S. Treasury said "
+    "growth would slow to 2.5 percent next year, citing weaker exports, higher rates and a "
+    "cooling housing market. Mr. Smith, who chairs the committee, disagreed. \"We have seen "
+    "this before,\" he said, adding that consumer spending remained strong through the "
+    "holiday season and that unemployment was still near historic lows. "
+) * 4
+
+def legacy_segments(text):
+    return [seg.strip() for seg in LEGACY_PATTERN.findall(text) if seg.strip()]
+
+def distribution(values):
+    if not values:
+        return {'count': 0}
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {'count': len(ordered), 'mean': sum(ordered) / len(ordered),
+            'p50': pick(0.5), 'p95': pick(0.95), 'max': ordered[-1]}
+
+def sample_texts(args):
+    texts = [extract_main_text(article_html(i, args.article_chars)) for i in range(args.articles)]
+    texts.append(ENGLISH_SAMPLE)
+    if args.fixtures:
+        for path in sorted(glob.glob(os.path.join(args.fixtures, '**', '*.html'), recursive=True)):
+            with open(path, encoding='utf-8') as f:
+                texts.append(extract_main_text(f.read()))
+    return texts
+
+def request_parts(text, lang):
+    """The pieces gTTS sends as separate requests for text"""
+    return gTTS(text, lang=lang, lang_check=False)._tokenize(text) or [text]
+
+def measure(name, split, texts, args):
+    lengths, request_latencies = [], []
+    segments_total = batches_total = requests_total = 0
+    split_seconds = 0.0
+    for text in texts:
+        started = time.perf_counter()
+        segments = split(text)
+        split_seconds += time.perf_counter() - started
+        langs = ['zh-cn' if script_of(segment) == 'cjk' else 'en' for segment in segments]
+        batches = batch_segments(segments, langs, max_chars=batch_chars('gtts'))
+        segments_total += len(segments)
+        batches_total += len(batches)
+        lengths.extend(len(segment) for segment in segments)
+        for batch in batches:
+            # gTTS sends a batch over its request size as one request per clause
+            parts = request_parts(batch['text'], batch['lang'])
+            requests_total += len(parts)
+            for part in parts:
+                request_latencies.append(args.request_latency + args.latency_per_char * len(part))
+    return {
+        'segmenter': name,
+        'segments': segments_total,
+        'segment_chars': distribution(lengths),
+        'tiny_segments': sum(1 for length in lengths if length < 8),
+        'oversized_segments': sum(1 for length in lengths if length > gTTS.GOOGLE_TTS_MAX_CHARS),
+        'batches': batches_total,
+        'tts_requests': requests_total,
+        'request_latency_seconds': distribution(request_latencies),
+        'split_ms_per_article': split_seconds * 1000 / max(1, len(texts)),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Segmenter request-count / latency benchmark")
+    parser.add_argument('--articles', type=int, default=20, help="Generated Chinese articles")
+    parser.add_argument('--article-chars', type=int, default=1500)
+    parser.add_argument('--fixtures', help="Directory of recorded article pages (*.html)")
+    parser.add_argument('--request-latency', type=float, default=0.25, help="Fixed seconds per TTS request")
+    parser.add_argument('--latency-per-char', type=float, default=0.002)
+    parser.add_argument('--output', help="Also write the JSON report here")
+    args = parser.parse_args()
+
+    texts = sample_texts(args)
+    report = {
+        'config': vars(args),
+        'texts': len(texts),
+        'results': [measure('legacy_regex', legacy_segments, texts, args),
+                    measure('segmenter', segment_text, texts, args)],
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
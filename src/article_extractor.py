@@ -0,0 +1,168 @@
+import threading
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+from src.config import ARTICLE_MAX_PAGES
+from src.http_client import fetch_text
+from src.metrics import span
+from src.segmenter import segment_text
+
+# Link text of the "next page" link on paginated articles
+NEXT_PAGE_TEXT = ('下一页', '下页', '下一頁', 'Next', 'Next Page')
+
+def is_next_page_text(text):
+    return text is not None and text.strip() in NEXT_PAGE_TEXT
+
+def find_next_page(soup, url):
+    """Absolute URL of the article's next page, or None on the last page"""
+    link = soup.find('a', rel='next') or soup.find('a', string=is_next_page_text)
+    if link is None or not link.get('href'):
+        return None
+    return urljoin(url, link['href'])
+
+def main_text_of(soup):
+    """Strip page chrome from a parsed page and return the readable article text"""
+    for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside']):
+        element.decompose()
+    for link in soup.find_all('a', string=is_next_page_text):
+        link.decompose()  # Not part of the article
+        
+    main_text = soup.get_text(separator='\n', strip=True)
+
+    # specific for wxc news
+    idx = main_text.find("被阅读次数")
+    if idx != -1:
+        main_text = main_text[idx+len("被阅读次数") + 8:] # skip the "被阅读次数" and the following 8 characters(A-AA+)
+    return main_text
+
+def extract_main_text(html):
+    """Strip page chrome and return the readable article text"""
+    return main_text_of(BeautifulSoup(html, 'html.parser'))
+
+def split_segments(text):
+    """Split text into speakable, request-sized segments"""
+    return segment_text(text)
+
+def parse_article(url, html, chars_limit=0):
+    """Turn one downloaded article page into its text, segments and next page URL.
+
+    chars_limit truncates the text before segmenting (0: no limit).
+    """
+    with span('parse', url=url):
+        soup = BeautifulSoup(html, 'html.parser')
+        next_url = find_next_page(soup, url)  # Before the chrome holding it is stripped
+        main_text = main_text_of(soup)
+    with span('segment', url=url):
+        segments = split_segments(main_text[:chars_limit] if chars_limit else main_text)
+    return {
+        'url': url,
+        'text': main_text,
+        'segments': segments,
+        'next_url': next_url,
+    }
+
+def iter_article_segments(url, chars_limit=0, html=None, max_pages=ARTICLE_MAX_PAGES):
+    """Yield an article's segments, fetching and extracting one page at a time.
+
+    Follows the article's pagination. Stops once chars_limit characters have
+    been yielded (0: read the whole article). html, if given, is the already
+    downloaded first page.
+    """
+    seen = set()
+    chars = 0
+    page_url = url
+    while page_url and page_url not in seen and len(seen) < max_pages:
+        seen.add(page_url)
+        page = parse_article(page_url, html if html is not None else fetch_text(page_url), 0)
+        html = None
+        for segment in page['segments']:
+            if chars_limit and chars >= chars_limit:
+                return
+            chars += len(segment)
+            yield segment
+        page_url = page['next_url']
+
+class ArticleSegments:
+    """An article's segments, extracted lazily as reading reaches them.
+
+    Indexes like a list of the segments pulled so far; ensure(n) pulls
+    pages until there are n segments or the article ends. Pulled segments
+    are kept, so a paused article resumes where it stopped.
+    """
+
+    def __init__(self, url, chars_limit=0, html=None, prefetched=None):
+        self.url = url
+        self.chars_limit = chars_limit
+        self.segments = []
+        self.done = False
+        self.complete = False  # Done because the article ended, not because of an error
+        self._source = iter_article_segments(url, chars_limit, html)
+        self._source_article = None  # The prefetched ArticleSegments read through, if any
+        self._prefetched = prefetched  # Future of the same article already being fetched
+        self._lock = threading.Lock()
+
+    def _take_prefetched(self):
+        """Read through the prefetched article once it is ready, instead of downloading again"""
+        prefetched, self._prefetched = self._prefetched, None
+        try:
+            article = prefetched.result()
+        except Exception as e:
+            print(f"Prefetch failed for {self.url}: {e}")
+            return
+        self._source_article = article
+        self._source = iter(article)
+
+    @classmethod
+    def from_segments(cls, url, segments, chars_limit=0):
+        """An article already extracted before, e.g. from the ArticleStore"""
+        article = cls(url, chars_limit)
+        chars = 0
+        for segment in segments:
+            if chars_limit and chars >= chars_limit:
+                break
+            article.segments.append(segment)
+            chars += len(segment)
+        article.done = article.complete = True
+        return article
+
+    def ensure(self, count):
+        """Pull segments until there are count of them; False if the article ran out.
+
+        An error on the first page is raised, one on a later page just ends
+        the article early.
+        """
+        with self._lock:
+            if self._prefetched is not None and count > len(self.segments):
+                self._take_prefetched()
+            while len(self.segments) < count and not self.done:
+                try:
+                    self.segments.append(next(self._source))
+                except StopIteration:
+                    self.done = True
+                    self.complete = self._source_article is None or self._source_article.complete
+                except Exception as e:
+                    self.done = True
+                    if not self.segments:
+                        raise
+                    print(f"Error reading more of {self.url}: {e}")
+            return len(self.segments) >= count
+
+    def __len__(self):
+        return len(self.segments)
+
+    def __getitem__(self, index):
+        return self.segments[index]
+
+    def __iter__(self):
+        index = 0
+        while self.ensure(index + 1):
+            yield self.segments[index]
+            index += 1
+
+def fetch_article(url, chars_limit=0):
+    """Download an article's first page and return its lazily extended ArticleSegments.
+
+    Raises requests.exceptions.RequestException on network errors.
+    """
+    article = ArticleSegments(url, chars_limit)
+    article.ensure(1)
+    return article
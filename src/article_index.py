@@ -0,0 +1,82 @@
+import os
+import sqlite3
+import threading
+import time
+from src.config import ARTICLE_DB_PATH
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS articles (
+    url TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    position INTEGER,
+    extracted INTEGER NOT NULL DEFAULT 0,
+    read INTEGER NOT NULL DEFAULT 0
+)
+'''
+
+class ArticleIndex:
+    """Persistent record of every article seen on the news list.
+
+    Keyed by URL, it remembers when an article first appeared, its place in
+    the most recent listing, and whether it has been extracted and read.
+    """
+
+    def __init__(self, path=ARTICLE_DB_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(SCHEMA)
+
+    def merge(self, articles):
+        """Record a fresh listing and return the articles never seen before"""
+        now = time.time()
+        with self._lock, self._conn:
+            known = {row['url'] for row in self._conn.execute('SELECT url FROM articles')}
+            new_articles = [article for article in articles if article['url'] not in known]
+            # Only the latest listing keeps a position
+            self._conn.execute('UPDATE articles SET position = NULL')
+            for position, article in enumerate(articles):
+                self._conn.execute(
+                    '''INSERT INTO articles (url, title, first_seen, last_seen, position)
+                       VALUES (?, ?, ?, ?, ?)
+                       ON CONFLICT(url) DO UPDATE SET
+                           title = excluded.title,
+                           last_seen = excluded.last_seen,
+                           position = excluded.position''',
+                    (article['url'], article['title'], now, now, position))
+        return new_articles
+
+    def latest(self):
+        """Articles of the most recent listing, in page order"""
+        with self._lock:
+            rows = self._conn.execute(
+                '''SELECT url, title, extracted, read FROM articles
+                   WHERE position IS NOT NULL ORDER BY position''').fetchall()
+        return [dict(row) for row in rows]
+
+    def state(self, url):
+        """Dict with 'extracted' and 'read' flags, or None if never seen"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT extracted, read FROM articles WHERE url = ?', (url,)).fetchone()
+        return dict(row) if row else None
+
+    def is_extracted(self, url):
+        state = self.state(url)
+        return bool(state and state['extracted'])
+
+    def mark_extracted(self, url):
+        with self._lock, self._conn:
+            self._conn.execute('UPDATE articles SET extracted = 1 WHERE url = ?', (url,))
+
+    def mark_read(self, url):
+        with self._lock, self._conn:
+            self._conn.execute('UPDATE articles SET read = 1 WHERE url = ?', (url,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+# Allow running as a script from the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.config import ARTICLE_DB_PATH
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS article_texts (
+    url TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    lang TEXT,
+    text TEXT NOT NULL,
+    segments TEXT NOT NULL,
+    saved_at REAL NOT NULL
+)
+'''
+
+# The trigram tokenizer matches any substring of 3+ characters, which also
+# works for Chinese, where words are not separated by spaces
+FTS_SCHEMA = '''
+CREATE VIRTUAL TABLE IF NOT EXISTS article_search
+USING fts5(url UNINDEXED, title, text, tokenize = 'trigram')
+'''
+FTS_MIN_CHARS = 3  # Shorter terms are looked up with LIKE instead
+
+def snippet_of(text, terms, width=40):
+    """A line of text around the first search term found in it"""
+    flat = ' '.join(text.split())
+    lowered = flat.lower()
+    found = [i for i in (lowered.find(term.lower()) for term in terms) if i != -1]
+    start = max(0, min(found) - width // 2) if found else 0
+    snippet = flat[start:start + width]
+    return ('…' if start else '') + snippet + ('…' if start + width < len(flat) else '')
+
+class ArticleStore:
+    """Extracted text of every article read in full, searchable offline.
+
+    Keeps each article's cleaned text, main language and segments keyed by
+    URL, next to the news list index, with an FTS5 index over titles and
+    text. Without FTS5 in the local SQLite, search falls back to LIKE.
+    """
+
+    def __init__(self, path=ARTICLE_DB_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(SCHEMA)
+            try:
+                self._conn.execute(FTS_SCHEMA)
+                self.fts = True
+            except sqlite3.OperationalError as e:  # SQLite built without FTS5 or trigram
+                print(f"Full-text search unavailable, using LIKE: {e}")
+                self.fts = False
+
+    def save(self, url, title, segments, lang=None):
+        """Store (or replace) an article's segments; its text is the segments joined"""
+        text = '\n'.join(segments)
+        with self._lock, self._conn:
+            self._conn.execute(
+                '''INSERT OR REPLACE INTO article_texts (url, title, lang, text, segments, saved_at)
+                   VALUES (?, ?, ?, ?, ?, ?)''',
+                (url, title, lang, text, json.dumps(segments, ensure_ascii=False), time.time()))
+            if self.fts:
+                self._conn.execute('DELETE FROM article_search WHERE url = ?', (url,))
+                self._conn.execute('INSERT INTO article_search (url, title, text) VALUES (?, ?, ?)',
+                                   (url, title, text))
+
+    def get(self, url):
+        """Dict with 'title', 'lang', 'text' and 'segments', or None if not stored"""
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM article_texts WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            return None
+        article = dict(row)
+        article['segments'] = json.loads(article['segments'])
+        return article
+
+    def search(self, query, limit=20):
+        """Stored articles containing every word of query, best match first.
+
+        Returns dicts with 'url', 'title', 'lang', 'saved_at' and a 'snippet'
+        of text around the match.
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        with self._lock:
+            if self.fts and all(len(term) >= FTS_MIN_CHARS for term in terms):
+                match = ' AND '.join('"' + term.replace('"', '""') + '"' for term in terms)
+                rows = self._conn.execute(
+                    '''SELECT t.url, t.title, t.lang, t.text, t.saved_at
+                       FROM article_search JOIN article_texts t USING (url)
+                       WHERE article_search MATCH ? ORDER BY rank LIMIT ?''',
+                    (match, limit)).fetchall()
+            else:
+                like = ' AND '.join(["(title || ' ' || text) LIKE ? ESCAPE '\\'"] * len(terms))
+                patterns = ['%' + re.sub(r'([%_\\])', r'\\\1', term) + '%' for term in terms]
+                rows = self._conn.execute(
+                    f'''SELECT url, title, lang, text, saved_at FROM article_texts
+                        WHERE {like} ORDER BY saved_at DESC LIMIT ?''',
+                    (*patterns, limit)).fetchall()
+        results = []
+        for row in rows:
+            result = dict(row)
+            result['snippet'] = snippet_of(result.pop('text'), terms)
+            results.append(result)
+        return results
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM article_texts').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search the articles stored by the reader")
+    parser.add_argument('query', nargs='?', help="Words that must all appear (title or text)")
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--show', metavar='URL', help="Print a stored article's text")
+    args = parser.parse_args(argv)
+
+    store = ArticleStore()
+    if args.show:
+        article = store.get(args.show)
+        if article is None:
+            print(f"Not stored: {args.show}")
+            return 1
+        print(f"{article['title']} [{article['lang']}]\n\n{article['text']}")
+        return 0
+    if not args.query:
+        print(f"{len(store)} articles stored")
+        return 0
+
+    results = store.search(args.query, args.limit)
+    for result in results:
+        saved = time.strftime('%Y-%m-%d', time.localtime(result['saved_at']))
+        print(f"{saved}  {result['title']}\n    {result['url']}\n    {result['snippet']}")
+    print(f"{len(results)} found")
+    return 0 if results else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
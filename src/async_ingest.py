@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+# Allow running as a script from the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.article_extractor import parse_article
+from src.config import INGEST_CONCURRENCY, HTTP_POOL_PER_HOST, ARTICLE_MAX_PAGES
+from src.http_client import fetch_text
+
+async def ingest_articles(articles, chars_limit=0, concurrency=INGEST_CONCURRENCY,
+                          per_host=HTTP_POOL_PER_HOST, parse_executor=None):
+    """Fetch and extract many articles concurrently.
+
+    An async generator yielding each article (with 'title', 'url', 'text' and
+    'segments') as soon as it is ready, in completion order; chars_limit
+    truncates each article (0: every page of it). Page downloads, later
+    pages of paginated articles included, are bounded by `concurrency`
+    overall and `per_host` per host; parsing runs in parse_executor (the
+    loop's default thread pool if None, or pass a ProcessPoolExecutor to
+    parse on several cores) so the loop never blocks.
+    Articles that fail to download are reported and skipped.
+    """
+    loop = asyncio.get_running_loop()
+    overall = asyncio.Semaphore(concurrency)
+    hosts = defaultdict(lambda: asyncio.Semaphore(per_host))
+    fetch_pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix='ingest')
+
+    async def ingest(article):
+        # Follows the pagination like iter_article_segments, one awaited page at a time
+        url = article['url']
+        segments = []
+        chars = 0
+        seen = set()
+        page_url = url
+        while page_url and page_url not in seen and len(seen) < ARTICLE_MAX_PAGES:
+            seen.add(page_url)
+            try:
+                async with overall, hosts[urlparse(page_url).netloc]:
+                    html = await loop.run_in_executor(fetch_pool, fetch_text, page_url)
+            except Exception as e:
+                if not segments:
+                    raise
+                print(f"Error reading more of {url}: {e}")  # Keep the pages read so far
+                break
+            page = await loop.run_in_executor(parse_executor, parse_article, page_url, html)
+            for segment in page['segments']:
+                if chars_limit and chars >= chars_limit:
+                    break
+                chars += len(segment)
+                segments.append(segment)
+            if chars_limit and chars >= chars_limit:
+                break
+            page_url = page['next_url']
+        return {'title': article['title'], 'url': url, 'text': '\n'.join(segments), 'segments': segments}
+
+    tasks = [asyncio.ensure_future(ingest(article)) for article in articles]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                yield await next_done
+            except Exception as e:
+                print(f"Error ingesting article: {e}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        fetch_pool.shutdown(wait=False, cancel_futures=True)
+
+async def ingest_news(chars_limit=0, concurrency=INGEST_CONCURRENCY):
+    """Ingest the whole current news list, printing throughput"""
+    from src.wxc_news_list import get_wenxuecity_news
+    loop = asyncio.get_running_loop()
+    articles = await loop.run_in_executor(None, get_wenxuecity_news)
+
+    started = time.perf_counter()
+    done = 0
+    async for article in ingest_articles(articles, chars_limit, concurrency):
+        done += 1
+        print(f"{done}/{len(articles)} {article['title']} ({len(article['segments'])} segments)")
+    elapsed = time.perf_counter() - started
+    print(f"Ingested {done} articles in {elapsed:.1f}s ({done / elapsed if elapsed else 0:.1f}/s)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch and extract all current news articles concurrently")
+    parser.add_argument('--concurrency', type=int, default=INGEST_CONCURRENCY)
+    parser.add_argument('--chars-limit', type=int, default=0, help="Characters read per article (0: all)")
+    args = parser.parse_args()
+    asyncio.run(ingest_news(args.chars_limit, args.concurrency))
@@ -0,0 +1,153 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+STALE_TEMP_SECONDS = 3600  # Older temp files are left over from a crash, not a write in progress
+RESCAN_SECONDS = 30  # How often the total is re-read from disk to count other processes' entries
+
+class AudioCache:
+    """Content-addressed on-disk cache of synthesized audio.
+
+    Entries are keyed by (normalized text, lang, backend) and evicted least
+    recently used first once the total size exceeds max_bytes. The GUI,
+    export workers and audio server may share the directory, so the total
+    is re-read from disk before evicting and every RESCAN_SECONDS.
+    """
+
+    SUFFIX = '.mp3'
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = None  # key -> size, oldest first; loaded on first use
+        self._total_bytes = 0
+        self._scanned_at = 0.0  # time.monotonic() of the last _load_index()
+
+    @staticmethod
+    def normalize_text(text):
+        """Collapse whitespace so trivially different strings share an entry"""
+        return re.sub(r'\s+', ' ', text).strip()
+
+    def make_key(self, text, lang, backend):
+        raw = '\0'.join([self.normalize_text(text), lang or '', backend])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + self.SUFFIX)
+
+    def _load_index(self):
+        """Rebuild the LRU order and total size from file times on disk"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        found = []
+        now = time.time()
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if not name.endswith(('.tmp', self.SUFFIX)):
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if name.endswith('.tmp'):
+                # Another process may be writing it; only a crash leaves one this old
+                if now - st.st_mtime > STALE_TEMP_SECONDS:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                continue
+            found.append((st.st_mtime, name[:-len(self.SUFFIX)], st.st_size))
+
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._scanned_at = time.monotonic()
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def _ensure_loaded(self):
+        if self._entries is None:
+            self._load_index()
+
+    def get(self, text, lang, backend):
+        """Return cached audio bytes, or None on a miss"""
+        if self.max_bytes <= 0:
+            return None
+        key = self.make_key(text, lang, backend)
+        with self._lock:
+            self._ensure_loaded()
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            path = self._path(key)
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                os.utime(path)  # Persist recency for the next start
+            except OSError:
+                self._total_bytes -= self._entries.pop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, text, lang, backend, data):
+        """Store audio bytes atomically and evict old entries over budget"""
+        if self.max_bytes <= 0 or not data or len(data) > self.max_bytes:
+            return
+        key = self.make_key(text, lang, backend)
+        with self._lock:
+            self._ensure_loaded()
+            # Write to a temp file and rename so a crash never leaves a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self._path(key))
+            except OSError as e:
+                print(f"Audio cache write failed: {e}")
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                return
+
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            # Rescan before evicting, and now and then anyway, so entries
+            # other processes wrote count too
+            if (self._total_bytes > self.max_bytes
+                    or time.monotonic() - self._scanned_at > RESCAN_SECONDS):
+                self._load_index()
+            self._evict()
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            entries = len(self._entries) if self._entries is not None else 0
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': entries,
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+            }
@@ -0,0 +1,199 @@
+import threading
+import time
+import wave
+from array import array
+
+try:
+    import miniaudio
+except ImportError:  # Playback falls back to spawning afplay
+    miniaudio = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+SAMPLE_RATE = 24000  # gTTS output rate; everything is resampled to this
+CHANNELS = 1
+FRAME_BYTES = 2 * CHANNELS  # 16-bit samples
+
+class NullSink:
+    """Discards audio. With realtime=True it consumes it at playback speed."""
+
+    def __init__(self, sample_rate=SAMPLE_RATE, realtime=False, buffer_seconds=0.2):
+        self.sample_rate = sample_rate
+        self.realtime = realtime
+        self.buffer_frames = int(buffer_seconds * sample_rate)
+        self.frames_written = 0
+        self._played = 0
+        self._clock = time.monotonic()
+
+    def _advance(self):
+        now = time.monotonic()
+        if self.realtime:
+            elapsed_frames = int((now - self._clock) * self.sample_rate)
+            self._played = min(self.frames_written, self._played + elapsed_frames)
+        else:
+            self._played = self.frames_written
+        self._clock = now
+
+    @property
+    def frames_played(self):
+        self._advance()
+        return self._played
+
+    def write(self, pcm):
+        self._advance()
+        self.frames_written += len(pcm) // FRAME_BYTES
+        # Block while more than the buffer is queued, like a sound card would
+        while self.frames_written - self.frames_played > self.buffer_frames:
+            time.sleep(0.01)
+
+    def clear(self):
+        self._advance()
+        self.frames_written = self._played
+
+    def close(self):
+        pass
+
+class WavFileSink(NullSink):
+    """Writes the continuous output stream to a WAV file (headless testing)"""
+
+    def __init__(self, path, sample_rate=SAMPLE_RATE, realtime=False):
+        super().__init__(sample_rate=sample_rate, realtime=realtime)
+        self._wav = wave.open(path, 'wb')
+        self._wav.setnchannels(CHANNELS)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(sample_rate)
+
+    def write(self, pcm):
+        self._wav.writeframes(pcm)
+        super().write(pcm)
+
+    def close(self):
+        self._wav.close()
+
+class DeviceSink:
+    """Plays through the sound card via one long-lived miniaudio stream.
+
+    Audio is appended to a small buffer that the device callback drains, so
+    consecutive clips run into each other without a gap.
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE, buffer_seconds=0.2):
+        self.sample_rate = sample_rate
+        self.buffer_bytes = int(buffer_seconds * sample_rate) * FRAME_BYTES
+        self.frames_played = 0
+        self._buffer = bytearray()
+        self._cond = threading.Condition()
+        self.device = miniaudio.PlaybackDevice(
+            output_format=miniaudio.SampleFormat.SIGNED16,
+            nchannels=CHANNELS,
+            sample_rate=sample_rate,
+        )
+        stream = self._stream()
+        next(stream)  # Prime the generator before handing it to the device
+        self.device.start(stream)
+
+    def _stream(self):
+        required_frames = yield b''
+        while True:
+            wanted = required_frames * FRAME_BYTES
+            with self._cond:
+                chunk = bytes(self._buffer[:wanted])
+                del self._buffer[:wanted]
+                self.frames_played += len(chunk) // FRAME_BYTES
+                self._cond.notify_all()
+            # Pad with silence when nothing is queued
+            required_frames = yield chunk + b'\0' * (wanted - len(chunk))
+
+    def write(self, pcm):
+        with self._cond:
+            self._cond.wait_for(lambda: len(self._buffer) <= self.buffer_bytes)
+            self._buffer += pcm
+
+    def clear(self):
+        with self._cond:
+            del self._buffer[:]
+            self._cond.notify_all()
+
+    def close(self):
+        self.device.close()
+
+def apply_volume(samples, volume):
+    """Scale 16-bit samples by a 0-100 volume"""
+    gain = max(0.0, min(1.0, volume / 100))
+    if gain == 1.0:
+        return samples.tobytes()
+    if numpy is not None:
+        scaled = numpy.frombuffer(samples, dtype=numpy.int16) * gain
+        return scaled.astype(numpy.int16).tobytes()
+    return array('h', (int(s * gain) for s in samples)).tobytes()
+
+class PlaybackEngine:
+    """Long-lived player that feeds MP3 buffers into one continuous sink.
+
+    play() decodes in memory (no temp files or player processes), applies the
+    volume and writes the PCM to the sink in small chunks. It returns when the
+    clip is about to finish, so the next clip can be queued seamlessly.
+    """
+
+    CHUNK_SECONDS = 0.05
+    TAIL_SECONDS = 0.15  # Return this long before the end to keep the stream gapless
+
+    def __init__(self, sink, sample_rate=SAMPLE_RATE):
+        self.sink = sink
+        self.sample_rate = sample_rate
+        self._frames_queued = 0
+        self._lock = threading.Lock()
+
+    def decode(self, audio):
+        decoded = miniaudio.decode(
+            audio,
+            output_format=miniaudio.SampleFormat.SIGNED16,
+            nchannels=CHANNELS,
+            sample_rate=self.sample_rate,
+        )
+        return decoded.samples
+
+    def play(self, audio, volume=80, on_tick=None):
+        """Play encoded audio bytes; on_tick(elapsed) returning True stops it"""
+        pcm = apply_volume(self.decode(audio), volume)
+        chunk_bytes = int(self.CHUNK_SECONDS * self.sample_rate) * FRAME_BYTES
+
+        with self._lock:
+            # Frames the sink may still be holding from the previous clip
+            start = max(self._frames_queued, self.sink.frames_played)
+            self._frames_queued = start + len(pcm) // FRAME_BYTES
+            tail = int(self.TAIL_SECONDS * self.sample_rate)
+
+            def elapsed():
+                return max(0, self.sink.frames_played - start) / self.sample_rate
+
+            for offset in range(0, len(pcm), chunk_bytes):
+                if on_tick is not None and on_tick(elapsed()):
+                    self.stop()
+                    return
+                self.sink.write(pcm[offset:offset + chunk_bytes])
+
+            while self.sink.frames_played < self._frames_queued - tail:
+                if on_tick is not None and on_tick(elapsed()):
+                    self.stop()
+                    return
+                time.sleep(0.02)
+
+    def stop(self):
+        """Drop whatever is still buffered so playback stops immediately"""
+        self.sink.clear()
+        self._frames_queued = self.sink.frames_played
+
+    def close(self):
+        self.sink.close()
+
+def create_sink(spec):
+    """Build a sink from a WXC_AUDIO_SINK value: device, null or wav:<path>"""
+    if spec == 'null':
+        return NullSink(realtime=True)
+    if spec.startswith('wav:'):
+        return WavFileSink(spec[len('wav:'):])
+    return DeviceSink()
@@ -0,0 +1,236 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, quote
+
+# Allow running as a script from the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.article_extractor import ArticleSegments
+from src.config import (BASE_URL, SYNTH_LOOKAHEAD, TTS_BACKEND, SERVER_HOST,
+                        SERVER_PORT, SERVER_NEWS_TTL, SERVER_MAX_ARTICLES)
+from src.metrics import METRICS, start_metrics_server
+from src.segment_batcher import plan_batches, PLAN_SEGMENTS
+from src.text_to_speech_online import SynthesisStream, resolve_lang, resolve_langs
+from src.tts_backends import get_backend, batch_chars
+from src.wxc_news_list import get_wenxuecity_news
+
+class ArticleAudio:
+    """One article's MP3 audio, synthesized once and shared by every listener.
+
+    A producer thread reads the article page by page and synthesizes the
+    title and then the article's batches, a few ahead, appending each MP3
+    part as it arrives. Listeners read the parts from the beginning and
+    wait for more, so one who joins late still hears the whole article.
+    """
+
+    def __init__(self, url, title=None, backend=TTS_BACKEND, lookahead=SYNTH_LOOKAHEAD):
+        self.url = url
+        self.title = title
+        self.backend = backend
+        self.lookahead = max(1, lookahead)
+        self.parts = []  # MP3 bytes, in playing order
+        self.done = False
+        self.error = None
+        self._cond = threading.Condition()
+
+    def start(self):
+        threading.Thread(target=self._produce, name='article-audio', daemon=True).start()
+        return self
+
+    def texts(self):
+        """Yield the (text, lang) pairs to synthesize: the title, then the article"""
+        if self.title:
+            yield self.title, resolve_lang(self.title)
+        article = ArticleSegments(self.url)
+        max_chars = batch_chars(self.backend)
+        start = 0
+        while article.ensure(start + PLAN_SEGMENTS) or len(article) > start:
+            end = min(len(article), start + PLAN_SEGMENTS)
+            langs = resolve_langs(article[start:end])
+            for batch in plan_batches(article[:end], langs, start=start, max_chars=max_chars):
+                yield batch['text'], batch['lang']
+            start = end
+
+    def _produce(self):
+        executor = ThreadPoolExecutor(max_workers=self.lookahead)
+        pending = deque()
+        try:
+            for text, lang in self.texts():
+                # No fallback to a WAV backend: it could not join the MP3 stream
+                stream = SynthesisStream(text, lang, self.backend, audio_format='mp3')
+                executor.submit(stream.run)
+                pending.append(stream)
+                if len(pending) > self.lookahead:
+                    self._collect(pending.popleft())
+            while pending:
+                self._collect(pending.popleft())
+        except Exception as e:
+            # Failed rather than served with a gap; the next request starts over
+            print(f"Error producing audio for {self.url}: {e}")
+            self.error = e
+            for stream in pending:
+                stream.cancel()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            with self._cond:
+                self.done = True
+                self._cond.notify_all()
+
+    def _collect(self, stream):
+        for audio, _ in stream.parts():
+            if stream.format != 'mp3':
+                raise ValueError(f"{stream.format} audio cannot join an MP3 stream")
+            with self._cond:
+                self.parts.append(audio)
+                self._cond.notify_all()
+        stream.result()
+        if stream.error is not None:
+            raise RuntimeError(f"synthesis failed: {stream.error}")
+
+    def wait_first(self):
+        """Wait until the first part is ready or the article is done; True if there is audio"""
+        with self._cond:
+            self._cond.wait_for(lambda: self.parts or self.done)
+            return bool(self.parts)
+
+    def stream(self):
+        """Yield the MP3 parts from the start, waiting for new ones until the article is done"""
+        index = 0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: index < len(self.parts) or self.done)
+                if index >= len(self.parts):
+                    return
+                part = self.parts[index]
+            index += 1
+            yield part
+
+class AudioServer:
+    """News list and article audio shared by all clients.
+
+    The news list is scraped at most once per news_ttl seconds and each
+    article is synthesized once however many clients ask for it, with the
+    audio of the last max_articles articles kept in memory.
+    """
+
+    def __init__(self, backend=TTS_BACKEND, news_ttl=SERVER_NEWS_TTL, max_articles=SERVER_MAX_ARTICLES):
+        self.backend = backend
+        self.news_ttl = news_ttl
+        self.max_articles = max(1, max_articles)
+        self._news = None
+        self._news_at = 0.0
+        self._news_lock = threading.Lock()
+        self._articles = OrderedDict()  # url -> ArticleAudio, least recently asked for first
+        self._lock = threading.Lock()
+
+    def news(self):
+        # Clients asking during a scrape wait for it instead of scraping again
+        with self._news_lock:
+            if self._news is None or time.monotonic() - self._news_at > self.news_ttl:
+                articles = get_wenxuecity_news()
+                if articles or self._news is None:  # Keep the last good list if a scrape fails
+                    self._news = articles
+                    self._news_at = time.monotonic()
+            return self._news
+
+    def article(self, url):
+        """The shared ArticleAudio for url, started on the first request"""
+        with self._lock:
+            audio = self._articles.get(url)
+            if audio is None or audio.error is not None:
+                title = next((a['title'] for a in (self._news or []) if a['url'] == url), None)
+                audio = ArticleAudio(url, title, self.backend).start()
+                self._articles[url] = audio
+            self._articles.move_to_end(url)
+            while len(self._articles) > self.max_articles:
+                self._articles.popitem(last=False)  # Listeners still holding it keep it alive
+            return audio
+
+def is_article_url(url):
+    """Only pages of the news site are fetched on a client's behalf"""
+    return urlparse(url).netloc == urlparse(BASE_URL).netloc and urlparse(url).scheme in ('http', 'https')
+
+def make_handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Chunked transfer encoding needs 1.1
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            if parsed.path == '/news':
+                self.send_news()
+            elif parsed.path == '/audio':
+                self.send_audio(parse_qs(parsed.query).get('url', [''])[0])
+            else:
+                self.send_error(404)
+
+        def send_news(self):
+            articles = [{'title': a['title'], 'url': a['url'],
+                         'audio': '/audio?url=' + quote(a['url'], safe='')} for a in server.news()]
+            data = json.dumps(articles, ensure_ascii=False).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def send_audio(self, url):
+            if not is_article_url(url):
+                self.send_error(400, "url must be an article on " + BASE_URL)
+                return
+            audio = server.article(url)
+            started = time.perf_counter()
+            # The status waits for the first part, so a failed article is an error, not empty audio
+            if not audio.wait_first():
+                self.send_error(502, f"Could not synthesize the article: {audio.error or 'no text'}")
+                return
+            METRICS.observe('server_time_to_first_audio', time.perf_counter() - started, url=url)
+            try:
+                self.send_response(200)
+                self.send_header('Content-Type', 'audio/mpeg')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                for part in audio.stream():
+                    self.wfile.write(b'%X\r\n%s\r\n' % (len(part), part))
+                    self.wfile.flush()
+                if audio.error is not None:
+                    # No final chunk: the listener sees an incomplete transfer, not a finished article
+                    self.close_connection = True
+                    return
+                self.wfile.write(b'0\r\n\r\n')
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True  # Listener went away; synthesis carries on for others
+
+    return Handler
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the news list and article audio over HTTP")
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--backend', default=TTS_BACKEND, help="TTS backend (must produce MP3)")
+    args = parser.parse_args(argv)
+
+    if get_backend(args.backend).audio_format != 'mp3' or get_backend(args.backend).direct_playback:
+        print(f"The {args.backend} backend does not produce MP3 audio")
+        return 1
+    start_metrics_server()
+    httpd = ThreadingHTTPServer((args.host, args.port), make_handler(AudioServer(args.backend)))
+    httpd.daemon_threads = True
+    print(f"News list at http://{args.host}:{args.port}/news, audio at /audio?url=<article url>")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+from src.segment_batcher import estimate_seconds, segment_offsets
+
+def format_seconds(seconds):
+    """m:ss, or h:mm:ss for long articles"""
+    seconds = max(0, int(seconds))
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+class ArticleTimeline:
+    """One continuous time axis over all batches of an article.
+
+    Batches play back to back, so a batch starts where the previous one
+    ended. A batch's length comes from its synthesized audio (decoded frame
+    count / MP3 header) once known, and from the text until then, which
+    gives segment start times, progress and an ETA. Batches are appended as
+    a lazily read article is planned, so the total covers what is known so far.
+    """
+
+    def __init__(self, segments, start=0):
+        self.segments = segments
+        self.planned_end = start  # Segment index up to which batches are planned
+        self.batches = []
+        self.estimates = []
+        self.fractions = []
+        self.streams = {}  # batch number -> SynthesisStream still in progress
+        self.durations = {}  # batch number -> measured length, once synthesized
+
+    def extend(self, batches):
+        """Append the batches planned for the next stretch of the article"""
+        for batch in batches:
+            self.batches.append(batch)
+            self.estimates.append(estimate_seconds(batch['text'], batch['lang']))
+            self.fractions.append(segment_offsets(
+                [self.segments[i] for i in range(batch['start'], batch['end'])], 1.0))
+            self.planned_end = batch['end']
+
+    def attach(self, number, stream):
+        """Take batch number's length from its synthesis from now on"""
+        self.streams[number] = stream
+
+    def collect(self):
+        """Keep just the length of finished syntheses, not their audio"""
+        for number, stream in list(self.streams.items()):
+            if stream.done:
+                del self.streams[number]
+                if stream.clip is not None:
+                    self.durations[number] = stream.duration()
+                else:
+                    self.estimates[number] = 0.0  # Failed or cancelled: nothing will play
+
+    def scale(self):
+        """Measured / estimated length over the batches synthesized so far"""
+        estimated = sum(self.estimates[n] for n in self.durations)
+        if not estimated:
+            return 1.0
+        return sum(self.durations.values()) / estimated
+
+    def duration(self, number):
+        self.collect()
+        if number in self.durations:
+            return self.durations[number]
+        stream = self.streams.get(number)
+        # The voice's real speaking rate corrects the text-based estimate
+        estimate = self.estimates[number] * self.scale()
+        return estimate if stream is None else stream.duration(estimate)
+
+    def batch_start(self, number):
+        """Seconds into the article at which batch number starts"""
+        return sum(self.duration(n) for n in range(number))
+
+    def total(self):
+        return self.batch_start(len(self.batches))
+
+    def cues(self, number):
+        """(offset within the batch as a fraction of its length, segment index) pairs"""
+        batch = self.batches[number]
+        return list(zip(self.fractions[number], range(batch['start'], batch['end'])))
+
+    def progress(self, number, elapsed):
+        """(position, total) in seconds, elapsed seconds into batch number"""
+        position = self.batch_start(number) + min(elapsed, self.duration(number))
+        return position, max(position, self.total())
@@ -0,0 +1,129 @@
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Allow running as a script from the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.article_extractor import fetch_article
+from src.config import TTS_RATE_LIMIT, TTS_RATE_BURST
+from src.segment_batcher import plan_batches
+from src.text_to_speech_online import synthesize, resolve_langs, is_speakable, set_synthesis_rate
+from src.tts_backends import batch_chars
+from src.wxc_news_list import get_wenxuecity_news
+
+def output_name(url, fmt):
+    """Stable file name for an article, e.g. news_2024_01_02_12345.mp3"""
+    path = re.sub(r'^https?://[^/]+/', '', url)
+    path = re.sub(r'\.html?$', '', path)
+    return re.sub(r'[^A-Za-z0-9]+', '_', path).strip('_') + '.' + fmt
+
+def write_atomic(path, write):
+    """Write through a temp file so an interrupted export is never mistaken for a finished one"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def write_wav(path, clips):
+    from src.audio_player import PlaybackEngine, WavFileSink
+    engine = PlaybackEngine(WavFileSink(path))
+    try:
+        for clip in clips:
+            engine.play(clip['audio'], volume=100)
+    finally:
+        engine.close()
+
+def write_mp3(path, clips):
+    if any(clip['format'] != 'mp3' for clip in clips):
+        raise ValueError("this TTS backend does not produce MP3, use --format wav")
+    # MP3 frames can simply be concatenated into one playable file
+    with open(path, 'wb') as f:
+        for clip in clips:
+            f.write(clip['audio'])
+
+def share_rate_limit(workers):
+    """Give a worker process its share of WXC_TTS_RATE_LIMIT, so all of them together keep to it"""
+    set_synthesis_rate(TTS_RATE_LIMIT / workers, max(1, TTS_RATE_BURST // workers))
+
+def export_article(article, output_dir, chars_limit, fmt):
+    """Fetch, segment and synthesize one article to a file (runs in a worker process)"""
+    path = os.path.join(output_dir, output_name(article['url'], fmt))
+    if os.path.exists(path):
+        return path, 'skipped', 0.0
+
+    started = time.perf_counter()
+    segments = list(fetch_article(article['url'], chars_limit))  # Every page of the article
+    if not segments:
+        return path, 'empty', time.perf_counter() - started
+
+    texts = [(article['title'], None)]
+    texts += [(batch['text'], batch['lang'])
+              for batch in plan_batches(segments, resolve_langs(segments), max_chars=batch_chars())]
+    clips = []
+    for text, lang in texts:
+        if not is_speakable(text):
+            continue
+        clip = synthesize(text, lang=lang)
+        if clip is None or clip['audio'] is None:
+            # A file with a batch missing would pass for a finished export
+            return path, 'failed', time.perf_counter() - started
+        clips.append(clip)
+    if not clips:
+        return path, 'failed', time.perf_counter() - started
+
+    write_atomic(path, lambda tmp: (write_wav if fmt == 'wav' else write_mp3)(tmp, clips))
+    return path, 'exported', time.perf_counter() - started
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the Wenxuecity news list to audio files")
+    parser.add_argument('--output-dir', default='exports', help="Directory for the audio files")
+    parser.add_argument('--workers', type=int, default=4, help="Articles processed in parallel")
+    parser.add_argument('--chars-limit', type=int, default=0, help="Characters read per article (0: all)")
+    parser.add_argument('--format', choices=['mp3', 'wav'], default='mp3')
+    parser.add_argument('--max-articles', type=int, default=0, help="Only export the first N articles")
+    args = parser.parse_args(argv)
+
+    articles = get_wenxuecity_news()
+    if args.max_articles:
+        articles = articles[:args.max_articles]
+    if not articles:
+        print("No articles found")
+        return 1
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    started = time.perf_counter()
+    counts = {}
+    workers = max(1, args.workers)
+    with ProcessPoolExecutor(max_workers=workers, initializer=share_rate_limit,
+                             initargs=(workers,)) as pool:
+        jobs = {
+            pool.submit(export_article, article, args.output_dir, args.chars_limit, args.format): article
+            for article in articles
+        }
+        for job in as_completed(jobs):
+            article = jobs[job]
+            try:
+                path, status, seconds = job.result()
+            except Exception as e:
+                path, status, seconds = article['url'], 'failed', 0.0
+                print(f"Error exporting {article['url']}: {e}")
+            counts[status] = counts.get(status, 0) + 1
+            print(f"[{status}] {article['title']} -> {path} ({seconds:.1f}s)")
+
+    summary = ', '.join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"Done in {time.perf_counter() - started:.1f}s: {summary}")
+    return 0 if not counts.get('failed') else 2
+
+if __name__ == "__main__":
+    sys.exit(main())
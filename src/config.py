@@ -0,0 +1,122 @@
+import os
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()  # Pick up a .env file in the working directory if present
+except ImportError:
+    pass
+
+def env_int(name, default):
+    """Read an integer setting from the environment"""
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+def env_float(name, default):
+    """Read a float setting from the environment"""
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+def env_str(name, default):
+    """Read a string setting from the environment"""
+    return os.environ.get(name) or default
+
+# Site the news list is scraped from (overridden by the offline benchmark)
+BASE_URL = env_str('WXC_BASE_URL', 'https://www.wenxuecity.com').rstrip('/')
+
+# Number of segments synthesized ahead of the one currently playing
+SYNTH_LOOKAHEAD = env_int('WXC_SYNTH_LOOKAHEAD', 3)
+
+# Target segment length in characters: shorter clauses are merged with
+# their neighbours, longer sentences split; 100 matches gTTS's request size
+SEGMENT_MIN_CHARS = env_int('WXC_SEGMENT_MIN_CHARS', 12)
+SEGMENT_MAX_CHARS = env_int('WXC_SEGMENT_MAX_CHARS', 100)
+
+# Budget for merging consecutive segments into one synthesis request. gTTS
+# splits longer text at every clause into separate HTTP requests, so more
+# than its 100 characters per request would cost requests, not save them
+BATCH_MAX_CHARS = env_int('WXC_BATCH_MAX_CHARS', 100)
+BATCH_MAX_SECONDS = env_float('WXC_BATCH_MAX_SECONDS', 30.0)
+
+try:
+    from appdirs import user_cache_dir
+    CACHE_ROOT = env_str('CACHE_DIR', user_cache_dir('WenxuecityTTS'))
+except ImportError:
+    CACHE_ROOT = env_str('CACHE_DIR', os.path.join(os.path.expanduser('~'), '.wenxuecity_tts'))
+
+# Upcoming articles prepared while the current one plays, and how many of
+# their synthesis batches are rendered ahead of time
+PREFETCH_DEPTH = env_int('WXC_PREFETCH_DEPTH', 1)
+PREFETCH_BATCHES = env_int('WXC_PREFETCH_BATCHES', 2)
+
+# Speech engine: auto (SAPI on Windows, else gtts), gtts, espeak, sapi or fake
+TTS_BACKEND = env_str('WXC_TTS_BACKEND', 'auto')
+
+# Audio output: auto, device, afplay, null or wav:<path>
+AUDIO_SINK = env_str('WXC_AUDIO_SINK', 'auto')
+
+# fasttext language model; models/lid.176.ftz is the ~1 MB compressed variant
+LID_MODEL_PATH = env_str('WXC_LID_MODEL', 'models/lid.176.bin')
+
+# Synthesized audio cache; a budget of 0 disables it
+AUDIO_CACHE_DIR = env_str('WXC_AUDIO_CACHE_DIR', os.path.join(CACHE_ROOT, 'audio'))
+AUDIO_CACHE_MAX_MB = env_int('WXC_AUDIO_CACHE_MAX_MB', 200)
+
+# Shared HTTP client: revalidation cache and its disk budget (0 disables
+# it), connections per host, timeouts in seconds
+HTTP_CACHE_DIR = env_str('WXC_HTTP_CACHE_DIR', os.path.join(CACHE_ROOT, 'http'))
+HTTP_CACHE_MAX_MB = env_int('WXC_HTTP_CACHE_MAX_MB', 50)
+HTTP_POOL_PER_HOST = env_int('WXC_HTTP_POOL_PER_HOST', 4)
+HTTP_CONNECT_TIMEOUT = env_float('WXC_HTTP_CONNECT_TIMEOUT', 5.0)
+HTTP_READ_TIMEOUT = env_float('WXC_HTTP_READ_TIMEOUT', 20.0)
+
+# Pages followed at most when an article is paginated
+ARTICLE_MAX_PAGES = env_int('WXC_ARTICLE_MAX_PAGES', 20)
+
+# Retries of failed network calls: attempts in all, and the exponential
+# backoff (with jitter) between them in seconds
+RETRY_ATTEMPTS = env_int('WXC_RETRY_ATTEMPTS', 3)
+RETRY_BASE_DELAY = env_float('WXC_RETRY_BASE_DELAY', 0.5)
+RETRY_MAX_DELAY = env_float('WXC_RETRY_MAX_DELAY', 8.0)
+
+# Requests per second (and burst) allowed to online TTS across all threads;
+# 0 disables the limit
+TTS_RATE_LIMIT = env_float('WXC_TTS_RATE_LIMIT', 5.0)
+TTS_RATE_BURST = env_int('WXC_TTS_RATE_BURST', 10)
+
+# Backend used while the main one keeps failing ('' for none), after how
+# many failures in a row, and for how long before trying the main one again
+TTS_FALLBACK_BACKEND = os.environ.get('WXC_TTS_FALLBACK', 'espeak')
+TTS_BREAKER_FAILURES = env_int('WXC_TTS_BREAKER_FAILURES', 3)
+TTS_BREAKER_RESET_SECONDS = env_float('WXC_TTS_BREAKER_RESET_SECONDS', 60.0)
+
+# Articles fetched at once by the asyncio ingestion pipeline
+INGEST_CONCURRENCY = env_int('WXC_INGEST_CONCURRENCY', 8)
+
+# Caption log: lines kept, and how often queued captions are drawn
+CAPTION_MAX_LINES = env_int('WXC_CAPTION_MAX_LINES', 1000)
+CAPTION_UPDATES_PER_SECOND = env_int('WXC_CAPTION_UPDATES_PER_SECOND', 4)
+
+# SQLite index of every article seen on the news list
+ARTICLE_DB_PATH = env_str('WXC_ARTICLE_DB', os.path.join(CACHE_ROOT, 'articles.db'))
+
+# Near-duplicate articles: estimated text similarity (0-1) above which two
+# articles count as the same story, the leading characters compared, and
+# whether Auto Continue skips a story already read under another title
+NEAR_DUP_THRESHOLD = env_float('WXC_NEAR_DUP_THRESHOLD', 0.8)
+NEAR_DUP_CHARS = env_int('WXC_NEAR_DUP_CHARS', 2000)
+NEAR_DUP_SKIP = env_int('WXC_NEAR_DUP_SKIP', 1)
+
+# Audio server (src/audio_server.py): address, how long a scraped news list
+# is served before scraping again, and articles whose audio is kept in memory
+SERVER_HOST = env_str('WXC_SERVER_HOST', '127.0.0.1')
+SERVER_PORT = env_int('WXC_SERVER_PORT', 8765)
+SERVER_NEWS_TTL = env_float('WXC_SERVER_NEWS_TTL', 300.0)
+SERVER_MAX_ARTICLES = env_int('WXC_SERVER_MAX_ARTICLES', 20)
+
+# Pipeline timing export: JSON lines file and/or a local /metrics port (0 = off)
+METRICS_JSONL = env_str('WXC_METRICS_JSONL', '')
+METRICS_PORT = env_int('WXC_METRICS_PORT', 0)
@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from src.config import (HTTP_CACHE_DIR, HTTP_CACHE_MAX_MB, HTTP_POOL_PER_HOST,
+                        HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+from src.metrics import span
+from src.resilience import retry
+
+try:
+    import brotli  # requests/urllib3 decode br only when this is installed
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Encoding': ACCEPT_ENCODING,
+}
+
+STALE_TEMP_SECONDS = 3600  # A temp file this old is left over from a crashed write
+
+# Responses worth retrying: rate limited or a temporary server problem
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+def is_transient(error):
+    """True for network errors a retry may get past"""
+    if isinstance(error, requests.exceptions.HTTPError):
+        return error.response is not None and error.response.status_code in RETRY_STATUSES
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+def get_proxies():
+    """Proxy configuration from HTTP_PROXY / HTTPS_PROXY, if set"""
+    return {
+        'http': os.environ.get('HTTP_PROXY'),
+        'https': os.environ.get('HTTPS_PROXY')
+    } if any(os.environ.get(k) for k in ['HTTP_PROXY', 'HTTPS_PROXY']) else None
+
+class HttpClient:
+    """Pooled keep-alive HTTP client with an on-disk revalidating cache.
+
+    Responses carrying an ETag or Last-Modified header are stored on disk;
+    the next fetch of the same URL sends If-None-Match / If-Modified-Since
+    and a 304 is answered from the stored copy. Stored pages are evicted
+    least recently used first once they take more than max_bytes.
+    """
+
+    def __init__(self, cache_dir=HTTP_CACHE_DIR, pool_per_host=HTTP_POOL_PER_HOST,
+                 timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+                 max_bytes=HTTP_CACHE_MAX_MB * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        # pool_block caps concurrent connections per host at pool_per_host
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_per_host, pool_block=True)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.requests = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+
+    def _cache_paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + '.json', base + '.body'
+
+    def _load(self, url):
+        if self.max_bytes <= 0:
+            return None, None
+        meta_path, body_path = self._cache_paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+            os.utime(body_path)  # Recency for eviction
+        except (OSError, ValueError):
+            return None, None
+        return meta, body
+
+    def _write_atomic(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _store(self, url, response):
+        meta = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'encoding': response.encoding or response.apparent_encoding,
+        }
+        if not (meta['etag'] or meta['last_modified']) or self.max_bytes <= 0:
+            return  # Nothing to revalidate against
+        meta_path, body_path = self._cache_paths(url)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Body first, so metadata never points at a missing body
+            self._write_atomic(body_path, response.content)
+            self._write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+        except OSError as e:
+            print(f"HTTP cache write failed: {e}")
+            return
+        self._evict()
+
+    def _evict(self):
+        """Remove the least recently used pages while the cache is over budget.
+
+        Sizes come from disk, so every process sharing the directory counts
+        the others' pages too.
+        """
+        entries = []  # (last used, key, bytes)
+        total = 0
+        now = time.time()
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if name.endswith('.tmp'):
+                if now - st.st_mtime > STALE_TEMP_SECONDS:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                continue
+            total += st.st_size
+            if name.endswith('.body'):
+                meta_path = path[:-len('.body')] + '.json'
+                meta_size = os.path.getsize(meta_path) if os.path.exists(meta_path) else 0
+                entries.append((st.st_mtime, name[:-len('.body')], st.st_size + meta_size))
+        for _, key, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            base = os.path.join(self.cache_dir, key)
+            for path in (base + '.json', base + '.body'):  # Metadata first, so it never points at a missing body
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+
+    def _get(self, url, headers):
+        response = self.session.get(url, headers=headers, proxies=get_proxies(), timeout=self.timeout)
+        if response.status_code in RETRY_STATUSES:
+            response.raise_for_status()
+        return response
+
+    def fetch_text(self, url):
+        """GET url and return its decoded text, revalidating any cached copy.
+
+        Timeouts, connection errors, 429 and 5xx responses are retried with
+        backoff. Raises requests.exceptions.RequestException on failure.
+        """
+        meta, body = self._load(url)
+        headers = {}
+        if meta is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        with span('fetch', url=url):
+            response = retry(lambda: self._get(url, headers), should_retry=is_transient)
+        with self._lock:
+            self.requests += 1
+            if response.status_code == 304 and meta is not None:
+                self.not_modified += 1
+        if response.status_code == 304 and meta is not None:
+            return body.decode(meta.get('encoding') or 'utf-8', errors='replace')
+
+        response.raise_for_status()
+        self._store(url, response)
+        return response.text
+
+    def stats(self):
+        with self._lock:
+            return {'requests': self.requests, 'not_modified': self.not_modified}
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Shared HTTP client, so every fetch reuses the same warm connections"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+def fetch_text(url):
+    return get_client().fetch_text(url)
@@ -0,0 +1,195 @@
+import hashlib
+import re
+import sys
+import os
+import threading
+import time
+from collections import OrderedDict
+from langdetect import detect as langdetect_detect
+from src.config import LID_MODEL_PATH
+from src.process_stats import current_rss_mb
+from src.metrics import METRICS
+
+def resource_path(relative_path):
+    """ Get absolute path to resource """
+    if getattr(sys, 'frozen', False):
+        base_path = sys._MEIPASS
+    else:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+_lid_model = None  # False once loading it has failed
+_lid_model_lock = threading.Lock()
+model_load_stats = {}  # Filled in once the model has been loaded
+
+def lid_model_path():
+    """Configured model file, falling back to whichever variant is bundled"""
+    path = resource_path(LID_MODEL_PATH)
+    if not os.path.exists(path):
+        for variant in ('models/lid.176.ftz', 'models/lid.176.bin'):
+            if os.path.exists(resource_path(variant)):
+                return resource_path(variant)
+    return path
+
+def get_lid_model():
+    """Load the fasttext model on first use instead of at import time.
+
+    Returns None if it cannot be loaded; a failed load is not retried.
+    """
+    global _lid_model
+    with _lid_model_lock:
+        if _lid_model is None:
+            _lid_model = False
+            path = lid_model_path()
+            rss_before = current_rss_mb()
+            started = time.perf_counter()
+            try:
+                import fasttext
+                _lid_model = fasttext.load_model(path)
+            except Exception as e:
+                print(f"Language model unavailable, using langdetect: {e}")
+                return None
+            model_load_stats.update({
+                'path': path,
+                'seconds': time.perf_counter() - started,
+                'rss_before_mb': rss_before,
+                'rss_after_mb': current_rss_mb(),
+            })
+            print(f"Loaded language model {os.path.basename(path)} in "
+                  f"{model_load_stats['seconds']:.2f}s, RSS {rss_before or 0:.0f} -> "
+                  f"{model_load_stats['rss_after_mb'] or 0:.0f} MB")
+        return _lid_model or None
+
+def clean_text_for_detection(text):
+    """Clean text for better language detection"""
+    # Remove URLs, emails, special chars
+    text = re.sub(r'http\S+', '', text)
+    text = re.sub(r'\S+@\S+', '', text)
+    text = re.sub(r'[^\w\s]', '', text)
+    return text.strip()
+
+def normalize_lang_code(code):
+    """Normalize language codes for TTS compatibility"""
+    LANGUAGE_MAP = {
+        'zh': 'zh-cn', 'jp': 'ja', 'kr': 'ko',
+        'iw': 'he', 'in': 'id', 'tl': 'fil'
+    }
+    code = code.split('-')[0].lower()
+    return LANGUAGE_MAP.get(code, code)
+
+def langdetect_fallback(text):
+    """Fallback to langdetect"""
+    try:
+        return langdetect_detect(text)
+    except:
+        return 'en'  # Final fallback
+
+class LanguageDetector:
+    """Language detection over many texts at once, memoized per text.
+
+    All uncached texts of a call go to fasttext in one list predict();
+    langdetect only runs for the ones fasttext is unsure about.
+    """
+
+    def __init__(self, load_model, threshold=0.7, max_memo=20000):
+        self.load_model = load_model  # Called on the first detection that needs the model
+        self.threshold = threshold
+        self.max_memo = max_memo
+        self._memo = OrderedDict()  # text hash -> language code
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.texts = 0
+        self.memo_hits = 0
+        self.fallbacks = 0
+        self.last_latency = 0.0
+        self.total_latency = 0.0
+
+    @staticmethod
+    def _hash(text):
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def detect_many(self, texts):
+        """Detect the language of each text; returns codes in input order"""
+        started = time.perf_counter()
+        keys = [self._hash(text) for text in texts]
+        found = {}
+        todo = OrderedDict()  # text hash -> text, repeats within the call detected once
+
+        with self._lock:
+            for key, text in zip(keys, texts):
+                if key in self._memo:
+                    self._memo.move_to_end(key)
+                    found[key] = self._memo[key]
+                    self.memo_hits += 1
+                elif key not in todo:
+                    todo[key] = text
+
+        if todo:
+            # One batched fasttext call for everything not memoized
+            lines = [text.replace("\n", " ") for text in todo.values()]
+            labels, probs = [[]] * len(lines), [[]] * len(lines)  # langdetect for all
+            model = self.load_model()  # None if it could not be loaded
+            if model is not None:
+                try:
+                    labels, probs = model.predict(lines)
+                except Exception as e:
+                    pass
+
+            for (key, text), label, prob in zip(todo.items(), labels, probs):
+                if len(label) and prob[0] > self.threshold:
+                    found[key] = label[0].replace('__label__', '')
+                else:
+                    found[key] = langdetect_fallback(text)
+                    self.fallbacks += 1
+
+            with self._lock:
+                for key in todo:
+                    self._memo[key] = found[key]
+                while len(self._memo) > self.max_memo:
+                    self._memo.popitem(last=False)
+
+        results = [found[key] for key in keys]
+        elapsed = time.perf_counter() - started
+        METRICS.observe('detect', elapsed, texts=len(texts), uncached=len(todo))
+        with self._lock:
+            self.calls += 1
+            self.texts += len(texts)
+            self.last_latency = elapsed
+            self.total_latency += elapsed
+        return results
+
+    def detect(self, text):
+        return self.detect_many([text])[0]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'texts': self.texts,
+                'memo_hits': self.memo_hits,
+                'fallbacks': self.fallbacks,
+                'last_latency_ms': self.last_latency * 1000,
+                'total_latency_ms': self.total_latency * 1000,
+            }
+
+DETECTOR = LanguageDetector(get_lid_model)
+
+def detect_language(text):
+    """Combined language detection using fasttext and langdetect"""
+    return DETECTOR.detect(text)
+
+def detect_languages(texts):
+    """Batched detect_language() over a list of texts"""
+    return DETECTOR.detect_many(texts)
+
+if __name__ == "__main__":
+    # Report what importing the speech module and the first detection cost
+    rss_start = current_rss_mb()
+    started = time.perf_counter()
+    import src.text_to_speech_online
+    print(f"Import src.text_to_speech_online: {time.perf_counter() - started:.2f}s, "
+          f"RSS {rss_start or 0:.0f} -> {current_rss_mb() or 0:.0f} MB")
+    started = time.perf_counter()
+    print(f"First detection: {detect_language('Hello world')} "
+          f"in {time.perf_counter() - started:.2f}s")
+    print(f"Model load: {model_load_stats}")
@@ -0,0 +1,139 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from src.config import METRICS_JSONL, METRICS_PORT
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+class Histogram:
+    """Latency samples for one stage; percentiles over the most recent ones"""
+
+    def __init__(self, max_samples=10000):
+        self.samples = deque(maxlen=max_samples)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self):
+        result = {'count': self.count, 'sum': self.total}
+        for q in QUANTILES:
+            result[f'p{int(q * 100)}'] = self.quantile(q)
+        return result
+
+class Metrics:
+    """Timing spans for the reading pipeline.
+
+    Each span is added to its stage's histogram and, if a path is set,
+    appended to a JSON lines file together with its tags (article URL,
+    segment index, ...). Tags set with context() on a thread apply to every
+    span recorded on that thread.
+    """
+
+    def __init__(self, jsonl_path=None):
+        self.jsonl_path = jsonl_path
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def context(self, **tags):
+        """Default tags for spans recorded on this thread inside the block"""
+        previous = getattr(self._local, 'tags', {})
+        self._local.tags = {**previous, **tags}
+        try:
+            yield
+        finally:
+            self._local.tags = previous
+
+    def observe(self, stage, seconds, **tags):
+        tags = {**getattr(self._local, 'tags', {}), **tags}
+        with self._lock:
+            if stage not in self.histograms:
+                self.histograms[stage] = Histogram()
+            self.histograms[stage].observe(seconds)
+            if self.jsonl_path:
+                record = {'ts': time.time(), 'stage': stage, 'seconds': seconds, **tags}
+                try:
+                    with open(self.jsonl_path, 'a', encoding='utf-8') as f:
+                        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                except OSError as e:
+                    print(f"Metrics write failed: {e}")
+
+    @contextmanager
+    def span(self, stage, **tags):
+        """Time the enclosed block as one observation of stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, **tags)
+
+    def summary(self):
+        with self._lock:
+            return {stage: hist.summary() for stage, hist in sorted(self.histograms.items())}
+
+    def prometheus_text(self):
+        """Histograms in the Prometheus text exposition format"""
+        lines = ['# HELP wxc_stage_seconds Time spent per reading pipeline stage',
+                 '# TYPE wxc_stage_seconds summary']
+        for stage, summary in self.summary().items():
+            for q in QUANTILES:
+                lines.append(f'wxc_stage_seconds{{stage="{stage}",quantile="{q}"}} '
+                             f'{summary[f"p{int(q * 100)}"]:.6f}')
+            lines.append(f'wxc_stage_seconds_sum{{stage="{stage}"}} {summary["sum"]:.6f}')
+            lines.append(f'wxc_stage_seconds_count{{stage="{stage}"}} {summary["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port, host='127.0.0.1'):
+        """Expose /metrics (Prometheus) and /metrics.json on a background thread"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body, content_type = metrics.prometheus_text(), 'text/plain; version=0.0.4'
+                elif self.path == '/metrics.json':
+                    body, content_type = json.dumps(metrics.summary()), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+        return server
+
+METRICS = Metrics(METRICS_JSONL)
+
+def span(stage, **tags):
+    return METRICS.span(stage, **tags)
+
+def start_metrics_server():
+    """Start the metrics endpoint if WXC_METRICS_PORT is set"""
+    if METRICS_PORT:
+        try:
+            METRICS.serve(METRICS_PORT)
+            print(f"Metrics at http://127.0.0.1:{METRICS_PORT}/metrics")
+        except OSError as e:
+            print(f"Metrics server failed to start: {e}")
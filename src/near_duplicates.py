@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import defaultdict
+from src.config import ARTICLE_DB_PATH, NEAR_DUP_THRESHOLD, NEAR_DUP_CHARS
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS article_signatures (
+    url TEXT PRIMARY KEY,
+    signature TEXT NOT NULL,
+    duplicate_of TEXT
+)
+'''
+
+SHINGLE_CHARS = 4  # Overlapping character n-grams; works without word boundaries (Chinese)
+SIGNATURE_SIZE = 64  # MinHash values per article
+BANDS = 16  # LSH bands of SIGNATURE_SIZE // BANDS values each
+MIN_CHARS = 50  # Too little text to tell stories apart
+EMPTY = -1  # A signature slot no shingle hashed into
+
+def normalize(text):
+    """Lowercase letters and digits only, so spacing and punctuation edits don't count"""
+    return re.sub(r'[\W_]+', '', text.lower())
+
+def signature(text, chars=NEAR_DUP_CHARS):
+    """MinHash signature of the first `chars` characters of text, or None if too short.
+
+    One-permutation MinHash: each shingle is hashed once and the hash picks
+    both the slot and the value, so it costs one hash per character rather
+    than one per character per slot.
+    """
+    text = normalize(text)[:chars]
+    if len(text) < MIN_CHARS:
+        return None
+    slots = [EMPTY] * SIGNATURE_SIZE
+    for i in range(len(text) - SHINGLE_CHARS + 1):
+        digest = hashlib.blake2b(text[i:i + SHINGLE_CHARS].encode('utf-8'), digest_size=8).digest()
+        value = int.from_bytes(digest, 'big')
+        slot, value = value % SIGNATURE_SIZE, value // SIGNATURE_SIZE
+        if slots[slot] == EMPTY or value < slots[slot]:
+            slots[slot] = value
+    return slots
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of the shingle sets two signatures came from"""
+    used = [(x, y) for x, y in zip(a, b) if x != EMPTY or y != EMPTY]
+    if not used:
+        return 0.0
+    return sum(1 for x, y in used if x == y) / len(used)
+
+def bands(sig):
+    rows = SIGNATURE_SIZE // BANDS
+    return [(band, tuple(sig[band * rows:(band + 1) * rows])) for band in range(BANDS)]
+
+class DuplicateIndex:
+    """Finds articles that are the same story under another title or URL.
+
+    Keeps a MinHash signature of the opening of every article read, stored
+    next to the article index. Locality-sensitive hashing over bands of the
+    signature finds likely matches without comparing against every
+    article; candidates are then confirmed with the full signature.
+    """
+
+    def __init__(self, path=ARTICLE_DB_PATH, threshold=NEAR_DUP_THRESHOLD):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.threshold = threshold
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._signatures = {}  # url -> signature
+        self._buckets = defaultdict(set)  # (band, values) -> urls
+        self._duplicate_of = {}  # url -> url of the article it repeats
+        with self._lock, self._conn:
+            self._conn.execute(SCHEMA)
+            for url, sig, original in self._conn.execute(
+                    'SELECT url, signature, duplicate_of FROM article_signatures'):
+                self._remember(url, json.loads(sig), original)
+
+    def _remember(self, url, sig, original):
+        self._signatures[url] = sig
+        for key in bands(sig):
+            self._buckets[key].add(url)
+        if original:
+            self._duplicate_of[url] = original
+
+    def find(self, sig, exclude=None):
+        """(url, similarity) of the most similar indexed article above the threshold, or None"""
+        candidates = set()
+        for key in bands(sig):
+            candidates |= self._buckets.get(key, set())
+        candidates.discard(exclude)
+        scored = [(similarity(sig, self._signatures[url]), url) for url in candidates]
+        scored = [(score, url) for score, url in scored if score >= self.threshold]
+        if not scored:
+            return None
+        score, url = max(scored)
+        return url, score
+
+    def check(self, url, text):
+        """Index an article's text; returns the URL of the earlier article it repeats, or None"""
+        with self._lock:
+            if url in self._signatures:
+                return self._duplicate_of.get(url)
+            sig = signature(text)
+            if sig is None:
+                return None
+            match = self.find(sig, exclude=url)
+            original = None
+            if match is not None:
+                original = self._duplicate_of.get(match[0], match[0])  # Point at the first version
+            with self._conn:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO article_signatures (url, signature, duplicate_of) VALUES (?, ?, ?)',
+                    (url, json.dumps(sig), original))
+            self._remember(url, sig, original)
+            return original
+
+    def duplicate_of(self, url):
+        """URL of the earlier article url repeats, if known"""
+        with self._lock:
+            return self._duplicate_of.get(url)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,79 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from src.config import PREFETCH_DEPTH, PREFETCH_BATCHES
+from src.segment_batcher import plan_batches, PLAN_SEGMENTS
+
+class ArticlePrefetcher:
+    """Prepare upcoming articles while the current one is being read.
+
+    Each prefetched article has its first page downloaded, extracted and
+    segmented, and its title announcement plus first few synthesis batches
+    are synthesized so they are waiting in the audio cache when playback
+    reaches them. A job's Future holds the article as soon as its first
+    page is extracted; the synthesis carries on after that.
+    """
+
+    def __init__(self, depth=PREFETCH_DEPTH, batches=PREFETCH_BATCHES):
+        self.depth = depth
+        self.batches = batches
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='prefetch')
+        self._jobs = {}  # (url, chars_limit) -> Future of the article's ArticleSegments
+        self._lock = threading.Lock()
+
+    def prefetch(self, articles, chars_limit):
+        """Start preparing the first `depth` of the given articles"""
+        with self._lock:
+            for article in articles[:self.depth]:
+                key = (article['url'], chars_limit)
+                if key not in self._jobs:
+                    self._jobs[key] = job = Future()
+                    self._executor.submit(self._prepare, article, chars_limit, job)
+
+    def _prepare(self, article, chars_limit, job):
+        if not job.set_running_or_notify_cancel():
+            return  # Cancelled before it started
+        # Imported here so creating a prefetcher stays cheap at GUI startup
+        from src.article_extractor import fetch_article
+        from src.text_to_speech_online import synthesize, resolve_lang, resolve_langs
+        from src.tts_backends import batch_chars
+        try:
+            prepared = fetch_article(article['url'], chars_limit)
+        except Exception as e:
+            job.set_exception(e)
+            return
+        job.set_result(prepared)  # Reading can start while the audio below is prepared
+
+        try:
+            # Same announcement handle_speech_finished makes before the article
+            title = article['title']
+            synthesize(f"Next article: {title}", lang=resolve_lang(title))
+
+            # The first chunk SpeakingThread will plan, so the batches match
+            prepared.ensure(PLAN_SEGMENTS)
+            segments = prepared[:PLAN_SEGMENTS]
+            if segments:
+                langs = resolve_langs(segments)
+                # Same budget as SpeakingThread, so the cached audio is found again
+                for batch in plan_batches(segments, langs, max_chars=batch_chars())[:self.batches]:
+                    synthesize(batch['text'], lang=batch['lang'])
+        except Exception as e:
+            print(f"Prefetching audio failed for {article['url']}: {e}")
+
+    def take(self, url, chars_limit):
+        """Hand over the prefetch of url: a Future of its ArticleSegments, or None.
+
+        A prefetch that has not started yet is cancelled instead, since a
+        fresh download would be no further behind.
+        """
+        with self._lock:
+            job = self._jobs.pop((url, chars_limit), None)
+        if job is None or job.cancel():
+            return None
+        return job
+
+    def retain(self, urls):
+        """Forget prepared articles whose URL is not in urls, e.g. after a refresh"""
+        urls = set(urls)
+        with self._lock:
+            for key in [key for key in self._jobs if key[0] not in urls]:
+                self._jobs.pop(key).cancel()
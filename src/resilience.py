@@ -0,0 +1,86 @@
+import random
+import threading
+import time
+from src.config import RETRY_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY
+
+def backoff_delays(attempts, base_delay, max_delay):
+    """Waits before each retry: exponential, with full jitter so clients spread out"""
+    for n in range(attempts - 1):
+        yield random.uniform(0, min(max_delay, base_delay * 2 ** n))
+
+def retry(func, should_retry=lambda error: True, attempts=RETRY_ATTEMPTS,
+          base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY):
+    """Call func(), retrying errors should_retry accepts up to attempts times in all"""
+    delays = backoff_delays(attempts, base_delay, max_delay)
+    while True:
+        try:
+            return func()
+        except Exception as e:
+            delay = next(delays, None)
+            if delay is None or not should_retry(e):
+                raise
+            print(f"Retrying in {delay:.1f}s after error: {e}")
+            time.sleep(delay)
+
+class TokenBucket:
+    """Thread-safe rate limiter: rate tokens per second, at most burst saved up.
+
+    A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, sleeping until one is available; returns the seconds waited"""
+        waited = 0.0
+        while self.rate > 0:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+        return waited
+
+class CircuitBreaker:
+    """Stops using a dependency that keeps failing.
+
+    After `failures` consecutive failures the breaker opens and allow()
+    returns False for reset_seconds. Afterwards calls are let through again;
+    one success closes it, one more failure opens it for another period.
+    """
+
+    def __init__(self, failures, reset_seconds):
+        self.threshold = max(1, failures)
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            return self.opened_at is None or time.monotonic() - self.opened_at >= self.reset_seconds
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+    @property
+    def is_open(self):
+        return not self.allow()
@@ -0,0 +1,64 @@
+from src.config import BATCH_MAX_CHARS, BATCH_MAX_SECONDS
+
+# Rough speaking rates used to turn a duration budget into characters
+CHARS_PER_SECOND = {'zh-cn': 4.5, 'en': 14.0}
+DEFAULT_CHARS_PER_SECOND = 10.0
+
+# Segments language-detected and batched at a time while an article is
+# read lazily; the prefetcher plans the same chunk so its batches match
+PLAN_SEGMENTS = 20
+
+def joiner(lang):
+    """Chinese text runs together, everything else is space separated"""
+    return '' if lang == 'zh-cn' else ' '
+
+def estimate_seconds(text, lang):
+    return len(text) / CHARS_PER_SECOND.get(lang, DEFAULT_CHARS_PER_SECOND)
+
+def batch_segments(segments, langs, max_chars=BATCH_MAX_CHARS, max_seconds=BATCH_MAX_SECONDS):
+    """Merge consecutive same-language segments into larger synthesis requests.
+
+    Returns a list of batches, each a dict with 'start'/'end' (segment index
+    range, end exclusive), 'lang' and the joined 'text'. A segment longer than
+    the budget becomes a batch of its own.
+    """
+    batches = []
+    current = None
+    for index, (segment, lang) in enumerate(zip(segments, langs)):
+        segment = segment.strip()
+        if current is not None and current['lang'] == lang:
+            candidate = current['text'] + joiner(lang) + segment
+            if (len(candidate) <= max_chars
+                    and estimate_seconds(candidate, lang) <= max_seconds):
+                current['text'] = candidate
+                current['end'] = index + 1
+                continue
+        current = {'start': index, 'end': index + 1, 'lang': lang, 'text': segment}
+        batches.append(current)
+    return batches
+
+def segment_offsets(segments, duration):
+    """Start offset in seconds of each segment within a batch's audio.
+
+    The batch duration (from the MP3 header) is spread over the segments in
+    proportion to their length, which is close enough for captions.
+    """
+    weights = [max(1, len(segment.strip())) for segment in segments]
+    total = sum(weights)
+    offsets = []
+    elapsed = 0.0
+    for weight in weights:
+        offsets.append(elapsed)
+        elapsed += duration * weight / total
+    return offsets
+
+def plan_batches(segments, langs, start=0, max_chars=BATCH_MAX_CHARS):
+    """Batch segments[start:] keeping indices relative to the full list.
+
+    langs holds the language of each segment from start onwards.
+    """
+    batches = batch_segments(segments[start:], langs, max_chars=max_chars)
+    for batch in batches:
+        batch['start'] += start
+        batch['end'] += start
+    return batches
@@ -0,0 +1,98 @@
+import re
+from src.config import SEGMENT_MIN_CHARS, SEGMENT_MAX_CHARS
+
+CJK_CHAR = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]')
+
+# Four or more Latin words in a row get their own segment (and voice);
+# shorter runs such as names, "GDP" or "iPhone 15" stay in the Chinese text
+LATIN_RUN = re.compile(
+    r"[\"“(]?[A-Za-z][A-Za-z0-9'’\-]*"
+    r"(?:[\s,.;:!?\"“”()%$&/\-–—]+[A-Za-z0-9][A-Za-z0-9'’\-]*){3,}"
+    r"[.!?\"”)]*")
+
+# Sentence ends in either script, plus line breaks between page elements;
+# a Latin full stop only counts before whitespace and not after an initial
+# or title, so 3.5, U.S. and Mr. stay whole
+SENTENCE_END = re.compile(
+    r'[。！？!?；;…]+[」』”’"）)]*'
+    r'|(?<!\b[A-Z])(?<!\bMr)(?<!\bMs)(?<!\bDr)(?<!\bMrs)(?<!\bSt)\.+[”’")]*(?=\s|$)'
+    r'|\n+')
+
+# Where an over-long sentence may be broken, best first
+CLAUSE_END = re.compile(r'[，、：]+|[,:](?=\s)')
+WORD_GAP = re.compile(r'\s+')
+
+def script_of(text):
+    """'cjk' if text contains Chinese characters, else 'latin'"""
+    return 'cjk' if CJK_CHAR.search(text) else 'latin'
+
+def split_at(text, pattern):
+    """Split text after every match of pattern, dropping blank pieces"""
+    pieces = []
+    start = 0
+    for match in pattern.finditer(text):
+        pieces.append(text[start:match.end()])
+        start = match.end()
+    pieces.append(text[start:])
+    return [piece.strip() for piece in pieces if piece.strip()]
+
+def split_scripts(text):
+    """Split text where it switches between Chinese and longer Latin passages.
+
+    Returns (run, script) pairs in order.
+    """
+    if not CJK_CHAR.search(text):
+        return [(text, 'latin')]
+    runs = []
+    start = 0
+    for match in LATIN_RUN.finditer(text):
+        before = text[start:match.start()]
+        if re.search(r'\w', before):
+            runs.append((before, 'cjk'))
+        runs.append((match.group(), 'latin'))
+        start = match.end()
+    if re.search(r'\w', text[start:]):
+        runs.append((text[start:], 'cjk'))
+    return runs
+
+def pack(pieces, joiner, min_chars, max_chars):
+    """Merge neighbouring pieces while one is under min_chars and both fit in max_chars"""
+    packed = []
+    for piece in pieces:
+        if packed:
+            merged = packed[-1] + joiner + piece
+            if (len(packed[-1]) < min_chars or len(piece) < min_chars) and len(merged) <= max_chars:
+                packed[-1] = merged
+                continue
+        packed.append(piece)
+    return packed
+
+def split_long(sentence, joiner, max_chars):
+    """Break a sentence over max_chars at clauses, then words, then anywhere"""
+    if len(sentence) <= max_chars:
+        return [sentence]
+    for pattern in (CLAUSE_END, WORD_GAP):
+        pieces = split_at(sentence, pattern)
+        if len(pieces) > 1:
+            parts = []
+            for piece in pieces:
+                parts.extend(split_long(piece, joiner, max_chars))
+            return pack(parts, joiner, max_chars, max_chars)
+    return [sentence[i:i + max_chars] for i in range(0, len(sentence), max_chars)]
+
+def segment_text(text, min_chars=SEGMENT_MIN_CHARS, max_chars=SEGMENT_MAX_CHARS):
+    """Split article text into speakable segments of roughly min..max characters.
+
+    Segments end at sentence boundaries of either script and never mix a
+    Chinese passage with a longer English one. Short clauses are merged with
+    their neighbours and long sentences split, so each segment is a
+    reasonable single TTS request.
+    """
+    segments = []
+    for run, script in split_scripts(text):
+        joiner = '' if script == 'cjk' else ' '
+        sentences = []
+        for sentence in split_at(run, SENTENCE_END):
+            sentences.extend(split_long(sentence, joiner, max_chars))
+        segments.extend(pack(sentences, joiner, min_chars, max_chars))
+    return segments
@@ -1,152 +1,377 @@
 import tempfile
-from gtts import gTTS
 import subprocess
 import time
+import wave
 from mutagen.mp3 import MP3  # New import for duration detection
-from langdetect import detect as langdetect_detect
-import re
-import fasttext
 import io
-import os
-import sys
-
-def resource_path(relative_path):
-    """ Get absolute path to resource """
-    if getattr(sys, 'frozen', False):
-        base_path = sys._MEIPASS
-    else:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
-
-# Load model with correct path
-LID_MODEL = fasttext.load_model(resource_path('models/lid.176.bin'))
-
-def clean_text_for_detection(text):
-    """Clean text for better language detection"""
-    # Remove URLs, emails, special chars
-    text = re.sub(r'http\S+', '', text)
-    text = re.sub(r'\S+@\S+', '', text)
-    text = re.sub(r'[^\w\s]', '', text)
-    return text.strip()
-
-def detect_language(text):
-    """Combined language detection using fasttext and langdetect"""
-    try:
-        # First try fasttext
-        predictions = LID_MODEL.predict(text.replace("\n", " "))
-        lang_code = predictions[0][0].replace('__label__', '')
-        confidence = predictions[1][0]
-        
-        if confidence > 0.7:
-            return lang_code
-    except Exception as e:
-        pass
-    
-    # Fallback to langdetect
-    try:
-        return langdetect_detect(text)
-    except:
-        return 'en'  # Final fallback
-
-def normalize_lang_code(code):
-    """Normalize language codes for TTS compatibility"""
-    LANGUAGE_MAP = {
-        'zh': 'zh-cn', 'jp': 'ja', 'kr': 'ko',
-        'iw': 'he', 'in': 'id', 'tl': 'fil'
-    }
-    code = code.split('-')[0].lower()
-    return LANGUAGE_MAP.get(code, code)
-
-def speak(text, lang=None, volume=80):
-    # Enhanced empty check with proper character stripping
-    if not text.strip('\'"""''?!-–— \t\n\r'):
-        return
-    
+import threading
+import atexit
+from src.audio_cache import AudioCache
+from src.config import (AUDIO_CACHE_DIR, AUDIO_CACHE_MAX_MB, AUDIO_SINK, TTS_BACKEND, TTS_RATE_LIMIT,
+                        TTS_RATE_BURST, TTS_FALLBACK_BACKEND, TTS_BREAKER_FAILURES,
+                        TTS_BREAKER_RESET_SECONDS)
+from src.tts_backends import get_backend
+from src import audio_player
+from src.metrics import METRICS, span
+from src.resilience import retry, TokenBucket, CircuitBreaker
+from src.language_detection import (resource_path, clean_text_for_detection, normalize_lang_code,
+                                    detect_language, detect_languages)
+
+_audio_cache = None
+_audio_cache_lock = threading.Lock()
+
+def get_audio_cache():
+    """Shared audio cache, created on first use"""
+    global _audio_cache
+    with _audio_cache_lock:
+        if _audio_cache is None:
+            _audio_cache = AudioCache(AUDIO_CACHE_DIR, AUDIO_CACHE_MAX_MB * 1024 * 1024)
+        return _audio_cache
+
+_playback_engine = None  # False once we know in-process playback is unavailable
+_playback_engine_lock = threading.Lock()
+
+def get_playback_engine():
+    """Shared in-process playback engine, or None to fall back to afplay"""
+    global _playback_engine
+    with _playback_engine_lock:
+        if _playback_engine is None:
+            _playback_engine = False
+            if AUDIO_SINK != 'afplay' and audio_player.miniaudio is not None:
+                try:
+                    _playback_engine = audio_player.PlaybackEngine(audio_player.create_sink(AUDIO_SINK))
+                    atexit.register(_playback_engine.close)  # Release the audio device on exit
+                except Exception as e:
+                    print(f"Audio output unavailable, falling back to afplay: {e}")
+        return _playback_engine or None
+
+# Shared by every thread, so prefetching and lookahead together stay under
+# the online service's rate limit
+_synthesis_limiter = TokenBucket(TTS_RATE_LIMIT, TTS_RATE_BURST)
+
+def set_synthesis_rate(rate, burst):
+    """Replace this process's online TTS rate limit, e.g. with one worker's share of it"""
+    global _synthesis_limiter
+    _synthesis_limiter = TokenBucket(rate, burst)
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(name):
+    """Circuit breaker tracking failures of one backend"""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(TTS_BREAKER_FAILURES, TTS_BREAKER_RESET_SECONDS)
+        return _breakers[name]
+
+def get_fallback_backend(engine, lang, audio_format=None):
+    """Backend to use when engine fails (WXC_TTS_FALLBACK), or None.
+
+    With audio_format set, a fallback producing another format is not used.
+    """
+    if not TTS_FALLBACK_BACKEND or TTS_FALLBACK_BACKEND == engine.name:
+        return None
     try:
+        fallback = get_backend(TTS_FALLBACK_BACKEND)
+    except ValueError:
+        return None
+    if not fallback.available() or not fallback.supports(lang) or fallback.direct_playback:
+        return None
+    if audio_format is not None and fallback.audio_format != audio_format:
+        return None
+    return fallback
+
+def stop_playback():
+    """Silence the in-process player at once (safe to call from any thread)"""
+    engine = _playback_engine or None  # Never opens the device just to stop it
+    if engine is not None:
+        engine.stop()
+
+def resolve_langs(texts):
+    """Detect the speaking language of each text, restricted to what wxc needs"""
+    detected = detect_languages([clean_text_for_detection(text) for text in texts])
+    langs = []
+    for code in detected:
+        lang = normalize_lang_code(code)
+
+        # fixed for wxc only
+        if lang not in ['en', 'zh-cn']:
+            lang = 'zh-cn'
+        langs.append(lang)
+    return langs
+
+def resolve_lang(text):
+    return resolve_langs([text])[0]
+
+def is_speakable(text):
+    """Enhanced empty check with proper character stripping"""
+    return bool(text.strip('\'"""''?!-–— \t\n\r'))
+
+def audio_duration(audio, audio_format):
+    """Length in seconds of encoded audio, from its headers"""
+    audio_buffer = io.BytesIO(audio)
+    if audio_format == 'wav':
+        with wave.open(audio_buffer) as wav:
+            return wav.getnframes() / wav.getframerate()
+    return MP3(audio_buffer).info.length
+
+class SynthesisStream:
+    """One synthesis whose audio can be played while later parts are still arriving.
+
+    run() synthesizes through the backend's stream() (normally on a worker
+    thread) and publishes each audio part as soon as it comes in; parts()
+    yields them to a player in order and result() waits for the finished
+    clip, the same dict synthesize() returns. audio_format, if given, rules
+    out falling back to a backend that produces another format.
+    """
+
+    def __init__(self, text, lang=None, backend=None, audio_format=None):
+        self.text = text
+        self.lang = lang
+        self.backend = backend or TTS_BACKEND
+        self.audio_format = audio_format
+        self.format = 'mp3'
+        self.done = False
+        self.cancelled = False
+        self.clip = None
+        self.error = None  # Why synthesis failed, if it did
+        self._parts = []  # (audio, duration) in arrival order
+        self._cond = threading.Condition()
+
+    def run(self):
+        clip = None
+        try:
+            clip = self._synthesize()
+        except AssertionError:
+            print(f"Skipped problematic text: '{self.text}'")
+        except Exception as e:
+            self.error = e
+            print(f"Speech error: {str(e)}")
+        finally:
+            self._finish(clip)
+        return clip
+
+    def _synthesize(self):
+        if not is_speakable(self.text):
+            return None
+
+        engine = get_backend(self.backend)
+
         # Auto-detect language if not specified
-        if lang is None:
-            cleaned = clean_text_for_detection(text)
-            detected = detect_language(cleaned)
-            lang = normalize_lang_code(detected)
+        if self.lang is None:
+            self.lang = resolve_lang(self.text)
+        fallback = get_fallback_backend(engine, self.lang, self.audio_format)
+        if fallback is not None and not get_breaker(engine.name).allow():
+            engine = fallback  # The main backend keeps failing, give it a rest
+        if not engine.supports(self.lang):
+            raise ValueError(f"{engine.name} cannot speak {self.lang}")
 
-            # fixed for wxc only
-            if lang not in ['en', 'zh-cn']:
-                lang = 'zh-cn'
+        clip = {'text': self.text, 'lang': self.lang, 'backend': engine.name,
+                'format': engine.audio_format, 'audio': None, 'duration': 0}
 
-        # for windows
-        if os.name == 'nt':
-            try:
-                import win32com.client
-                speaker = win32com.client.Dispatch("SAPI.SpVoice")
-                
-                # Set voice based on language
-                voices = speaker.GetVoices()
-                if lang == 'zh-cn':
-                    # Find Chinese voice
-                    for voice in voices:
-                        if 'Chinese' in voice.GetDescription():
-                            speaker.Voice = voice
-                            break
-                else:
-                    # Default to English voice
-                    for voice in voices:
-                        if 'English' in voice.GetDescription():
-                            speaker.Voice = voice
-                            break
-                
-                # Set volume (0-100)
-                speaker.Volume = volume
-                speaker.Speak(text)
-                
-            except ImportError:
-                # Fallback to using powershell if pywin32 is not installed
-                if lang == 'zh-cn':
-                    # Use Chinese voice in PowerShell
-                    subprocess.run(['powershell', '-Command', 
-                        f'Add-Type -AssemblyName System.speech; $speaker = New-Object System.speech.synthesis.speechSynthesizer; $speaker.SelectVoice("Microsoft Huihui Desktop"); $speaker.Speak("{text}")'], 
-                        check=True)
-                else:
-                    # Use default English voice
-                    subprocess.run(['powershell', '-Command', 
-                        f'Add-Type -AssemblyName System.speech; (New-Object System.speech.synthesis.speechSynthesizer).Speak("{text}")'], 
-                        check=True)
-        else:
-            tts = gTTS(text=text, lang=lang)
-            
-            # Generate audio to memory buffer
-            audio_buffer = io.BytesIO()
-            tts.write_to_fp(audio_buffer)
-            audio_buffer.seek(0)  # Reset buffer position for reading
-            
-            # Get audio duration from memory
+        # e.g. SAPI speaks directly, nothing to prepare ahead
+        if engine.direct_playback:
+            return clip
+
+        try:
+            audio = self._render(engine)
+        except Exception as e:
+            # Fail over only while nothing has been handed to the player yet
+            if fallback is None or engine is fallback or self._parts:
+                raise
+            print(f"Speech error from {engine.name}: {e}; using {fallback.name}")
+            engine = fallback
+            clip.update(backend=engine.name, format=engine.audio_format)
+            audio = self._render(engine)
+        if audio is None:
+            return None
+
+        duration = sum(seconds for _, seconds in self._parts)
+        if not duration:
+            duration = len(self.text.split()) * 0.3
+        clip.update(audio=audio, duration=duration)
+        return clip
+
+    def _render(self, engine):
+        """Audio for the text from engine, from the cache or streamed in part by part"""
+        self.format = engine.audio_format
+        cache = get_audio_cache()
+        audio = cache.get(self.text, self.lang, engine.name)
+        if audio is not None:
+            self._publish(audio)
+            return audio
+
+        parts = []
+        started = time.perf_counter()
+
+        def attempt():
+            # A retry starts over; parts already published are not repeated
+            skip = len(parts)
+            # Online backends take a limiter token before each request they make
+            throttle = _synthesis_limiter.acquire if engine.remote else None
+            for index, part in enumerate(engine.stream(self.text, self.lang, throttle)):
+                if self.cancelled:
+                    return False
+                if index < skip:
+                    continue
+                if not parts:
+                    METRICS.observe('synthesize_first_part', time.perf_counter() - started,
+                                    backend=engine.name)
+                parts.append(part)
+                self._publish(part)
+            return True
+
+        breaker = get_breaker(engine.name)
+        with span('synthesize', chars=len(self.text), lang=self.lang, backend=engine.name):
             try:
-                audio = MP3(audio_buffer)
-                duration = audio.info.length
-                audio_buffer.seek(0)  # Reset buffer again for playback
-            except Exception as e:
-                duration = len(text.split()) * 0.3
-            
-            # Split text into words
-            words = text.split()
-            delay = 0 # duration / len(words) if words else 0
+                finished = retry(attempt, should_retry=lambda e: not isinstance(e, (ValueError, AssertionError)))
+            except Exception:
+                breaker.record_failure()
+                raise
+        breaker.record_success()
+        if not finished:
+            return None
+        audio = b''.join(parts)
+        cache.put(self.text, self.lang, engine.name, audio)
+        return audio
+
+    def _publish(self, audio):
+        # Every part is a complete file of its own, so it can be measured alone
+        try:
+            with span('mp3_parse'):
+                duration = audio_duration(audio, self.format)
+        except Exception:
+            duration = 0.0
+        with self._cond:
+            self._parts.append((audio, duration))
+            self._cond.notify_all()
+
+    def _finish(self, clip):
+        with self._cond:
+            if not self.done:
+                self.clip = clip
+                self.done = True
+            self._cond.notify_all()
+
+    def cancel(self):
+        """Give up on the synthesis; waiting players see the stream end"""
+        self.cancelled = True
+        self._finish(None)
+
+    def parts(self):
+        """Yield (audio, duration) parts as they arrive, until synthesis ends"""
+        index = 0
+        while True:
+            with self._cond:
+                while index >= len(self._parts) and not self.done:
+                    self._cond.wait()
+                if index >= len(self._parts) or self.cancelled:
+                    return
+                part = self._parts[index]
+            index += 1
+            yield part
+
+    def result(self):
+        """Wait for the synthesis to end and return its clip (or None)"""
+        with self._cond:
+            while not self.done:
+                self._cond.wait()
+            return self.clip
+
+    def duration(self, estimate=0.0):
+        """Length of the audio: exact once done, until then at least estimate"""
+        with self._cond:
+            if self.done and self.clip is not None:
+                return self.clip['duration']
+            known = sum(seconds for _, seconds in self._parts)
+            return known if self.done else max(known, estimate)
+
+def synthesize(text, lang=None, backend=None):
+    """Synthesize text into an audio clip without playing it.
+
+    backend is a registered TTS backend name (default: WXC_TTS_BACKEND).
+    Returns a dict with 'text', 'lang', 'backend', 'format', 'audio' (encoded
+    bytes, or None for backends that speak directly at play time) and
+    'duration', or None if the text is empty or synthesis failed.
+    """
+    return SynthesisStream(text, lang, backend).run()
+
+def play_audio(clip, volume=80, on_tick=None):
+    """Play a clip produced by synthesize(), blocking until it finishes.
+
+    If given, on_tick(elapsed_seconds) is polled during playback; returning
+    True stops the clip early.
+    """
+    with span('playback', seconds_of_audio=clip['duration']):
+        _play_audio(clip, volume, on_tick)
+
+def _play_audio(clip, volume, on_tick):
+    try:
+        if clip['audio'] is None:
+            get_backend(clip['backend']).speak(clip['text'], clip['lang'], volume)
+            return
+
+        engine = get_playback_engine()
+        if engine is not None:
+            engine.play(clip['audio'], volume=volume, on_tick=on_tick)
+            return
+
+        # Create temporary in-memory file (uses system's temp directory which is often RAM-backed)
+        with tempfile.NamedTemporaryFile(suffix='.' + clip['format'], delete=True) as temp_file:
+            temp_file.write(clip['audio'])
+            temp_file.flush()  # Ensure all data is written
             
-            # Create temporary in-memory file (uses system's temp directory which is often RAM-backed)
-            with tempfile.NamedTemporaryFile(suffix='.mp3', delete=True) as temp_file:
-                temp_file.write(audio_buffer.read())
-                temp_file.flush()  # Ensure all data is written
-                
-                # Convert 0-100 scale to 0.0-1.0 for afplay
-                volume_level = max(0.0, min(1.0, volume / 100))
-                player = subprocess.Popen(['afplay', '-v', str(volume_level), temp_file.name])
-                time.sleep(delay)
+            # Convert 0-100 scale to 0.0-1.0 for afplay
+            volume_level = max(0.0, min(1.0, volume / 100))
+            player = subprocess.Popen(['afplay', '-v', str(volume_level), temp_file.name])
+            if on_tick is None:
                 player.wait()
+                return
+
+            started = time.monotonic()
+            while player.poll() is None:
+                if on_tick(time.monotonic() - started):
+                    player.terminate()
+                    player.wait()
+                    break
+                time.sleep(0.05)
 
-    except AssertionError:
-        print(f"Skipped problematic text: '{text}'")
     except Exception as e:
         print(f"Speech error: {str(e)}")
 
+def play_stream(stream, volume=80, on_tick=None):
+    """Play a SynthesisStream part by part, starting as soon as the first part arrives.
+
+    on_tick works as in play_audio, with elapsed counted from the start of
+    the whole stream.
+    """
+    played = 0.0
+    stopped = False
+
+    def tick(elapsed):
+        nonlocal stopped
+        stopped = bool(on_tick(played + elapsed))
+        return stopped
+
+    for audio, duration in stream.parts():
+        part = {'text': stream.text, 'lang': stream.lang, 'backend': stream.backend,
+                'format': stream.format, 'audio': audio, 'duration': duration}
+        play_audio(part, volume=volume, on_tick=tick if on_tick is not None else None)
+        if stopped:
+            return
+        played += duration
+
+    clip = stream.result()
+    if clip is not None and clip['audio'] is None:
+        play_audio(clip, volume=volume)  # Backend speaks directly
+
+def speak(text, lang=None, volume=80, backend=None):
+    stream = SynthesisStream(text, lang, backend)
+    threading.Thread(target=stream.run, daemon=True).start()
+    play_stream(stream, volume=volume)
+
 
 if __name__ == "__main__":
     input_text = input("Enter text to speak: ")
-    speak(input_text) 
\ No newline at end of file
+    speak(input_text)
+    print(f"Audio cache: {get_audio_cache().stats()}") 
\ No newline at end of file
@@ -0,0 +1,202 @@
+import io
+import os
+import shutil
+import subprocess
+import time
+from gtts import gTTS
+from src.config import BATCH_MAX_CHARS, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, TTS_BACKEND
+
+# One silent MPEG-1 Layer III frame: 128 kbps, 44.1 kHz, mono, 1152 samples
+SILENT_MP3_FRAME = bytes([0xFF, 0xFB, 0x90, 0xC4]) + b'\x00' * 413
+SILENT_MP3_FRAME_SECONDS = 1152 / 44100
+
+def silent_mp3(seconds):
+    """MP3 bytes of roughly the given length of silence"""
+    return SILENT_MP3_FRAME * max(1, round(seconds / SILENT_MP3_FRAME_SECONDS))
+
+def speak_windows(text, lang, volume):
+    """Speak text with SAPI, or PowerShell if pywin32 is not installed"""
+    try:
+        import win32com.client
+        speaker = win32com.client.Dispatch("SAPI.SpVoice")
+        
+        # Set voice based on language
+        voices = speaker.GetVoices()
+        if lang == 'zh-cn':
+            # Find Chinese voice
+            for voice in voices:
+                if 'Chinese' in voice.GetDescription():
+                    speaker.Voice = voice
+                    break
+        else:
+            # Default to English voice
+            for voice in voices:
+                if 'English' in voice.GetDescription():
+                    speaker.Voice = voice
+                    break
+        
+        # Set volume (0-100)
+        speaker.Volume = volume
+        speaker.Speak(text)
+        
+    except ImportError:
+        # Fallback to using powershell if pywin32 is not installed
+        if lang == 'zh-cn':
+            # Use Chinese voice in PowerShell
+            subprocess.run(['powershell', '-Command', 
+                f'Add-Type -AssemblyName System.speech; $speaker = New-Object System.speech.synthesis.speechSynthesizer; $speaker.SelectVoice("Microsoft Huihui Desktop"); $speaker.Speak("{text}")'], 
+                check=True)
+        else:
+            # Use default English voice
+            subprocess.run(['powershell', '-Command', 
+                f'Add-Type -AssemblyName System.speech; (New-Object System.speech.synthesis.speechSynthesizer).Speak("{text}")'], 
+                check=True)
+
+class TTSBackend:
+    """A speech synthesis engine and what it can do.
+
+    Capability flags:
+      streaming        stream() yields audio in parts as they are produced
+      max_text_length  longest text accepted per request (None: no limit)
+      languages        language codes it can speak (None: anything)
+      audio_format     container of the returned bytes ('mp3' or 'wav')
+      direct_playback  speaks through the OS itself instead of returning audio
+      remote           each request goes to an online service (rate limited)
+    """
+
+    name = None
+    streaming = False
+    remote = False
+    max_text_length = None
+    languages = None
+    audio_format = 'mp3'
+    direct_playback = False
+
+    def available(self):
+        return True
+
+    def supports(self, lang):
+        return self.languages is None or lang in self.languages
+
+    def synthesize(self, text, lang):
+        """Return the audio for text as bytes in audio_format"""
+        raise NotImplementedError
+
+    def stream(self, text, lang, before_request=None):
+        """Yield the audio for text in parts; by default all at once.
+
+        before_request, if given, is called before each request the backend
+        makes, e.g. to take a rate limiter token.
+        """
+        if before_request is not None:
+            before_request()
+        yield self.synthesize(text, lang)
+
+    def speak(self, text, lang, volume):
+        """Speak text directly (direct_playback backends only)"""
+        raise NotImplementedError
+
+class GTTSBackend(TTSBackend):
+    """Google Translate TTS: good voices, one network round-trip per ~100 chars"""
+
+    name = 'gtts'
+    streaming = True
+    remote = True
+    max_text_length = 100  # gTTS.GOOGLE_TTS_MAX_CHARS; longer text goes out as one request per clause
+    timeout = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)  # Per request, so a stalled one fails
+
+    def synthesize(self, text, lang):
+        audio_buffer = io.BytesIO()
+        gTTS(text=text, lang=lang, timeout=self.timeout).write_to_fp(audio_buffer)
+        return audio_buffer.getvalue()
+
+    def stream(self, text, lang, before_request=None):
+        # One gTTS request per clause it would split the text into, so each is throttled
+        for part in gTTS(text, lang=lang, lang_check=False)._tokenize(text) or [text]:
+            if before_request is not None:
+                before_request()
+            yield from gTTS(text=part, lang=lang, timeout=self.timeout).stream()
+
+class EspeakBackend(TTSBackend):
+    """Local offline espeak-ng: robotic, but milliseconds per segment and no network"""
+
+    name = 'espeak'
+    languages = {'en', 'zh-cn'}
+    audio_format = 'wav'
+    VOICES = {'en': 'en', 'zh-cn': 'cmn'}
+
+    def executable(self):
+        return shutil.which('espeak-ng') or shutil.which('espeak')
+
+    def available(self):
+        return self.executable() is not None
+
+    def synthesize(self, text, lang):
+        result = subprocess.run(
+            [self.executable(), '--stdout', '-v', self.VOICES.get(lang, 'en'), text],
+            capture_output=True, check=True)
+        return result.stdout
+
+class SapiBackend(TTSBackend):
+    """Windows SAPI voices, spoken directly by the OS"""
+
+    name = 'sapi'
+    direct_playback = True
+
+    def available(self):
+        return os.name == 'nt'
+
+    def speak(self, text, lang, volume):
+        speak_windows(text, lang, volume)
+
+class FakeBackend(TTSBackend):
+    """Deterministic silent audio with configurable latency, for tests and benchmarks"""
+
+    name = 'fake'
+    streaming = True
+    max_text_length = 100  # Splits requests like gTTS, so it gets the same batches
+
+    def __init__(self, latency=0.3, seconds_per_char=0.2):
+        self.latency = latency  # Seconds per request
+        self.seconds_per_char = seconds_per_char
+        self.requests = 0
+        self.fail_requests = 0  # Upcoming requests that fail, to exercise retries
+
+    def stream(self, text, lang, before_request=None):
+        # One request for short text, otherwise one per clause, as gTTS sends them
+        parts = gTTS(text, lang=lang, lang_check=False)._tokenize(text) if text.strip() else []
+        for part in parts or [text]:
+            if before_request is not None:
+                before_request()
+            self.requests += 1
+            time.sleep(self.latency)
+            if self.fail_requests > 0:
+                self.fail_requests -= 1
+                raise ConnectionError("fake TTS request failed")
+            yield silent_mp3(len(part) * self.seconds_per_char)
+
+    def synthesize(self, text, lang):
+        return b''.join(self.stream(text, lang))
+
+BACKENDS = {}
+
+def register_backend(backend):
+    """Make a backend selectable by name (WXC_TTS_BACKEND)"""
+    BACKENDS[backend.name] = backend
+    return backend
+
+for _backend in (GTTSBackend(), EspeakBackend(), SapiBackend(), FakeBackend()):
+    register_backend(_backend)
+
+def get_backend(name='auto'):
+    """Look up a backend; 'auto' is SAPI on Windows and gTTS elsewhere"""
+    if name == 'auto':
+        name = 'sapi' if os.name == 'nt' else 'gtts'
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown TTS backend: {name} (have {', '.join(sorted(BACKENDS))})")
+    return BACKENDS[name]
+
+def batch_chars(name=TTS_BACKEND):
+    """Batch budget for a backend: BATCH_MAX_CHARS, within what one of its requests takes"""
+    max_length = get_backend(name).max_text_length
+    return min(BATCH_MAX_CHARS, max_length) if max_length else BATCH_MAX_CHARS
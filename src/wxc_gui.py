@@ -1,26 +1,80 @@
 import sys
 import os
+import time
+STARTED = time.perf_counter()  # Startup phases are timed from here
 
 # Get the parent directory of the current file's directory
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
 from PyQt5.QtWidgets import *
-from PyQt5.QtGui import QTextCursor, QColor, QFont
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
-import requests
-import time
-from bs4 import BeautifulSoup
-from langdetect import detect, LangDetectException
-from src.text_to_speech_online import speak, detect_language, clean_text_for_detection, normalize_lang_code
-import re
+from PyQt5.QtGui import QTextCursor, QFont
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
+# The speech pipeline (gTTS, mutagen, miniaudio, langdetect, fasttext,
+# requests, bs4) is imported where it is first used, and warmed up in the
+# background once the window is up, so the window and the saved news list
+# appear without waiting for it
+from src.config import (SYNTH_LOOKAHEAD, TTS_BACKEND,
+                        CAPTION_MAX_LINES, CAPTION_UPDATES_PER_SECOND, NEAR_DUP_SKIP)
+from src.segment_batcher import plan_batches, PLAN_SEGMENTS
+from src.audio_timeline import ArticleTimeline, format_seconds
+from src.prefetch import ArticlePrefetcher
+from src.article_index import ArticleIndex
+from src.article_store import ArticleStore
+from src.near_duplicates import DuplicateIndex
+from src.metrics import METRICS, start_metrics_server
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+import html
+import threading
+
+startup_times = {}  # Startup phase -> seconds after launch
+
+def mark_startup(phase, **tags):
+    """Record when a startup phase was first reached"""
+    if phase in startup_times:
+        return
+    seconds = time.perf_counter() - STARTED
+    startup_times[phase] = seconds
+    METRICS.observe(f'startup_{phase}', seconds, **tags)
+    print(f"Startup: {phase} after {seconds * 1000:.0f} ms")
+
+def warm_up():
+    """Import the speech pipeline and load the language model off the UI thread"""
+    def load():
+        with METRICS.span('startup_warm_up'):
+            from src import text_to_speech_online, article_extractor
+            from src.language_detection import get_lid_model
+            get_lid_model()  # Logs a missing model itself; detection then uses langdetect
+    thread = threading.Thread(target=load, name='warm-up', daemon=True)
+    thread.start()
+    return thread
+
+mark_startup('imports')
 
 class SpeakingThread(QThread):
     update_output_signal = pyqtSignal(str)
+    progress_signal = pyqtSignal(float, float)  # Seconds played, expected total
+    extracted_signal = pyqtSignal(object)  # Whole article's segments and main language, for the store
+    duplicate_signal = pyqtSignal(str, bool)  # URL of the earlier article this one repeats, skipped
+    first_page_signal = pyqtSignal(str)  # URL, once the article's first page is extracted
+    failed_signal = pyqtSignal()  # The article could not be read at all
     finished_signal = pyqtSignal()
+
+    INTRO_PAUSE = 0.5  # Seconds between the intro and the article
     
-    def __init__(self, words, lang='en', start_index=0, get_volume=lambda: 80, auto_detect=True):
+    def __init__(self, words, lang='en', start_index=0, get_volume=lambda: 80, auto_detect=True,
+                 lookahead=SYNTH_LOOKAHEAD, url='', requested_at=None, backend=TTS_BACKEND,
+                 intro=None, intro_lang=None, duplicates=None, skip_duplicate=None):
         super().__init__()
+        self.duplicates = duplicates  # DuplicateIndex the article is checked against and added to
+        self.skip_duplicate = skip_duplicate  # skip_duplicate(original_url): True to pass over a repeat
+        self.intro = intro  # Spoken before the article, e.g. "Next article: <title>"
+        self.intro_lang = intro_lang
+        self.backend = backend  # Registered TTS backend name
+        self.url = url  # Tags timing spans
+        self.requested_at = requested_at  # perf_counter() when the article was requested
+        self.first_audio_recorded = False
         self.words = words
         self.original_lang = lang  # Store original language
         self.current_lang = lang    # Track current speaking language
@@ -29,51 +83,249 @@ class SpeakingThread(QThread):
         self.current_index = start_index
         self.get_volume = get_volume  # Store volume getter function
         self.auto_detect = auto_detect  # Auto-detect flag
-        
+        self.lookahead = max(0, lookahead)  # Segments synthesized ahead of playback
+        self.timeline = None  # ArticleTimeline of the batches being read
+        self.progress_reported = -1
+        self.streams = []  # Every synthesis started, so stop() can cancel them
+
+    def start_stream(self, executor, text, lang, segment=None):
+        """Queue a synthesis; its audio can be played while it streams in"""
+        from src.text_to_speech_online import SynthesisStream
+        stream = SynthesisStream(text, lang, self.backend)
+        self.streams = [s for s in self.streams if not s.done] + [stream]
+        executor.submit(self.synthesize_stream, stream, segment)
+        return stream
+
+    def start_batch(self, executor, number):
+        batch = self.timeline.batches[number]
+        stream = self.start_stream(executor, batch['text'], batch['lang'], segment=batch['start'])
+        self.timeline.attach(number, stream)
+        return stream
+
+    def synthesize_stream(self, stream, segment):
+        """Run one synthesis (on a worker thread)"""
+        if self.stopped:
+            stream.cancel()
+            return
+        with METRICS.context(url=self.url, segment=segment):
+            stream.run()
+
+    def record_first_audio(self):
+        """Time from requesting the article to its first audio starting"""
+        if self.requested_at is not None and not self.first_audio_recorded:
+            self.first_audio_recorded = True
+            seconds = time.perf_counter() - self.requested_at
+            METRICS.observe('time_to_first_audio', seconds, url=self.url)
+            print(f"Time to first audio: {seconds:.2f}s")
+
+    def announce(self, index):
+        """Emit the caption for a segment as it starts playing"""
+        self.current_index = index
+        word = self.words[index].strip()
+        current_time = time.strftime("%H:%M:%S")
+        output_message = f"[{current_time}] Speaking: {word}"
+        print(output_message)
+        # The total grows while later pages of the article are still to come
+        total = f"{len(self.words)}{'' if getattr(self.words, 'done', True) else '+'}"
+        self.update_output_signal.emit(f"Speaking ({self.current_lang}): {index + 1}/{total} - {word}")
+
+    def report_progress(self, number, elapsed):
+        """Emit article progress, at most once per second of audio"""
+        position, total = self.timeline.progress(number, elapsed)
+        if int(position) != self.progress_reported:
+            self.progress_reported = int(position)
+            self.progress_signal.emit(position, total)
+
+    def play_batch(self, number, stream):
+        """Play a batch, firing each segment's caption at its offset in the audio"""
+        batch = self.timeline.batches[number]
+        with METRICS.context(url=self.url, segment=batch['start']):
+            self._play_batch(number, stream)
+
+    def _play_batch(self, number, stream):
+        from src.text_to_speech_online import play_audio, play_stream
+        batch = self.timeline.batches[number]
+        clip = stream.result() if stream.done else None
+        if stream.done and (clip is None or not clip['duration']):
+            self.record_first_audio()
+            for index in range(batch['start'], batch['end']):
+                self.announce(index)
+            if clip is not None:
+                play_audio(clip, volume=self.get_volume())
+            return
+
+        # Captions fire at each segment's share of the batch audio, whose
+        # length is estimated from the text while it is still streaming in
+        cues = self.timeline.cues(number)
+
+        def on_tick(elapsed):
+            self.record_first_audio()
+            duration = self.timeline.duration(number)
+            while cues and elapsed >= cues[0][0] * duration:
+                self.announce(cues.pop(0)[1])
+            self.report_progress(number, elapsed)
+            return self.stopped
+
+        if clip is not None:
+            on_tick(0)
+            play_audio(clip, volume=self.get_volume(), on_tick=on_tick)
+        else:
+            # Not synthesized yet: start on its first part rather than the whole batch
+            play_stream(stream, volume=self.get_volume(), on_tick=on_tick)
+        if not self.stopped:
+            for _, index in cues:  # Audio ended before the estimate did
+                self.announce(index)
+
+    def plan_more(self, executor):
+        """Detect and batch the next chunk of segments; False once the article is exhausted.
+
+        words may be an ArticleSegments, which fetches later pages on demand.
+        """
+        from src.text_to_speech_online import resolve_langs
+        from src.language_detection import DETECTOR
+        from src.tts_backends import batch_chars
+        start = self.timeline.planned_end
+        ensure = getattr(self.words, 'ensure', None)
+        if ensure is not None:
+            ensure(start + PLAN_SEGMENTS)
+        end = min(len(self.words), start + PLAN_SEGMENTS)
+        if end <= start:
+            self.report_extracted()
+            return False
+
+        # Merge consecutive same-language segments into fewer, larger requests
+        chunk = [word.strip() for word in self.words[start:end]]
+        with METRICS.context(url=self.url):
+            langs = resolve_langs(chunk)  # One batched detection call per chunk
+        print(f"Detected {len(chunk)} segments in {DETECTOR.last_latency * 1000:.1f} ms")
+        # Keep requests within what the backend accepts
+        self.timeline.extend(plan_batches(self.words[:end], langs, start=start,
+                                          max_chars=batch_chars(self.backend)))
+        self.timeline.planned_end = end
+
+        if ensure is not None:
+            # Fetch the next page in the background before playback needs it
+            executor.submit(ensure, end + PLAN_SEGMENTS)
+        return True
+
+    def is_repeat(self):
+        """Index the article's opening; True if it repeats one to skip"""
+        if getattr(self.words, 'ensure', None) is not None:
+            self.words.ensure(PLAN_SEGMENTS)
+        original = self.duplicates.check(self.url, ' '.join(self.words[:PLAN_SEGMENTS]))
+        if original is None:
+            return False
+        skip = self.skip_duplicate is not None and self.skip_duplicate(original)
+        self.duplicate_signal.emit(original, skip)
+        return skip
+
+    def report_extracted(self):
+        """Emit the article once every page of it has been extracted"""
+        if not getattr(self.words, 'complete', False) or self.words.chars_limit:
+            return  # Failed part way or truncated: not worth keeping
+        chars = {}
+        for batch in self.timeline.batches:
+            chars[batch['lang']] = chars.get(batch['lang'], 0) + len(batch['text'])
+        lang = max(chars, key=chars.get) if chars else None
+        self.extracted_signal.emit({'url': self.url, 'segments': list(self.words.segments), 'lang': lang})
+
+    def play_intro(self, stream):
+        """Speak the intro, then pause briefly before the article starts"""
+        from src.text_to_speech_online import play_stream
+        play_stream(stream, volume=self.get_volume(), on_tick=lambda elapsed: self.stopped)
+        pause_until = time.monotonic() + self.INTRO_PAUSE
+        while not self.stopped and time.monotonic() < pause_until:
+            time.sleep(0.02)
+
     def run(self):
-        total_words = len(self.words)
+        # Producer/consumer: workers synthesize batches N+1..N+k while N plays
+        executor = ThreadPoolExecutor(max_workers=max(1, self.lookahead) + 1)
+        try:
+            finished = self.read(executor)
+        finally:
+            # Drop queued synthesis so a pause does not keep the workers busy
+            executor.shutdown(wait=False, cancel_futures=True)
 
-        if total_words == 0:  # Add empty check
-            self.update_output_signal.emit("Error: No content to speak")
+        # A stopped thread stays quiet, so a late finish cannot trigger Auto Continue
+        if self.stopped:
             return
-            
-        text_chunk = []
-        while self.current_index < total_words and not self.stopped:
-            word = self.words[self.current_index].strip()
-            text_chunk.append(word)
-            
-            if len(text_chunk) >= 1 or self.current_index == total_words - 1:
-                full_text = ' '.join(text_chunk)
-                detected_lang = detect_language(clean_text_for_detection(full_text))
-                normalized_lang = normalize_lang_code(detected_lang)
-
-                # fixed for wxc only
-                if normalized_lang not in ['en', 'zh-cn']:
-                    normalized_lang = 'zh-cn'
-                
-                if normalized_lang != self.current_lang:
-                    self.current_lang = normalized_lang
-                    print(f"Language changed to: {normalized_lang}")
-                text_chunk = []
-            
-            # Update output before speaking
-            current_time = time.strftime("%H:%M:%S")
-            output_message = f"[{current_time}] Speaking: {word}"
-            print(output_message)
-            self.update_output_signal.emit(f"Speaking ({self.current_lang}): {self.current_index + 1}/{total_words} - {word}")
-            
+        if finished:
+            self.finished_signal.emit()
+        else:
+            self.failed_signal.emit()
+
+    def read(self, executor):
+        """Read the article; False if it could not be started"""
+        import requests
+        intro = None
+        if self.intro:
+            # Synthesized while the article's first page is fetched
+            intro = self.start_stream(executor, self.intro, self.intro_lang)
+
+        try:
+            if getattr(self.words, 'ensure', None) is not None:
+                self.words.ensure(self.current_index + 1)  # First page, unless prefetched
+        except requests.exceptions.RequestException as e:
+            self.update_output_signal.emit(f"Error fetching URL: {e}")
+            return False
+        if len(self.words) == 0:  # Add empty check
+            self.update_output_signal.emit("Error: No content to speak")
+            return False
+        self.first_page_signal.emit(self.url)
+        if self.duplicates is not None and self.current_index == 0 and self.is_repeat():
+            for stream in self.streams:
+                stream.cancel()  # Including the intro
+            return True
+
+        self.timeline = ArticleTimeline(self.words, start=self.current_index)
+        pending = {}  # batch number -> SynthesisStream of its audio
+        batches = self.timeline.batches
+        number = 0
+        while not self.stopped:
+            # Plan just far enough ahead to keep the lookahead window full
+            while len(batches) <= number + self.lookahead and self.plan_more(executor):
+                pass
+            if number >= len(batches):
+                break
+            batch = batches[number]
+            for ahead in range(number, min(len(batches), number + self.lookahead + 1)):
+                if ahead not in pending:
+                    pending[ahead] = self.start_batch(executor, ahead)
+
+            if intro is not None:
+                self.play_intro(intro)
+                intro = None
+                continue  # Re-check stopped before the article starts
+
+            stream = pending.pop(number)
+
+            if batch['lang'] != self.current_lang:
+                self.current_lang = batch['lang']
+                print(f"Language changed to: {self.current_lang}")
+
             try:
-                current_volume = self.get_volume()  # Get fresh volume value
-                speak(word, lang=self.current_lang, volume=current_volume)
-                self.current_index += 1
+                self.play_batch(number, stream)
             except Exception as e:
                 self.update_output_signal.emit(f"Speech Error: {str(e)}")
                 break
-        
-        self.finished_signal.emit()
+            if self.stopped:
+                break  # Stopped mid-batch: resume from the segment that was playing
+            self.current_index = batch['end']
+            number += 1
+        return True
 
     def stop(self):
+        """Stop within a tick: silence the output and abandon pending synthesis.
+
+        Requests already in flight run to completion on their worker but
+        their audio is discarded.
+        """
+        from src.text_to_speech_online import stop_playback
         self.stopped = True
+        stop_playback()
+        for stream in list(self.streams):
+            if not stream.done:
+                stream.cancel()
 
 class NewsFetcherThread(QThread):
     news_fetched = pyqtSignal(list)
@@ -86,6 +338,52 @@ class NewsFetcherThread(QThread):
         articles = get_wenxuecity_news()
         self.news_fetched.emit(articles)
 
+class CaptionLog(QPlainTextEdit):
+    """Read-only caption log holding at most max_lines lines.
+
+    Lines are queued and drawn together at most updates_per_second times a
+    second, so an all-day session costs the same memory and repaint time as
+    a short one.
+    """
+
+    def __init__(self, max_lines=CAPTION_MAX_LINES, updates_per_second=CAPTION_UPDATES_PER_SECOND):
+        super().__init__()
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(max_lines)
+        self.pending = deque(maxlen=max_lines)  # (text, is_error) not drawn yet
+        self.timer = QTimer(self)
+        self.timer.setInterval(int(1000 / max(1, updates_per_second)))
+        self.timer.timeout.connect(self.flush)
+
+    def add_line(self, text, error=False):
+        self.pending.append((text, error))
+        if not self.timer.isActive():
+            # Draw right away, then coalesce whatever follows until the next tick
+            self.flush()
+            self.timer.start()
+
+    def flush(self):
+        if not self.pending:
+            self.timer.stop()
+            return
+        lines = []
+        while self.pending:
+            text, error = self.pending.popleft()
+            if error:
+                if lines:
+                    self.appendPlainText('\n'.join(lines))
+                    lines = []
+                self.appendHtml(f"<span style='color:red;'>{html.escape(text)}</span>")
+            else:
+                lines.append(text)
+        if lines:
+            self.appendPlainText('\n'.join(lines))
+        self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
+
+    def clear(self):
+        self.pending.clear()
+        super().clear()
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -119,11 +417,18 @@ class MainWindow(QMainWindow):
         self.refresh_news_btn.setFixedWidth(50)  # Set fixed width
         self.refresh_news_btn.setToolTip("Refresh news list")
         
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search saved articles")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.returnPressed.connect(self.search_articles)
+        self.search_input.textChanged.connect(lambda text: text or self.show_saved_news())
+
         # Create horizontal layout for label + button
         news_header = QHBoxLayout()
         news_header.setContentsMargins(0, 0, 0, 5)  # Add bottom margin
         news_header.addWidget(self.news_label)
         news_header.addStretch()
+        news_header.addWidget(self.search_input)
         
         # Add button with alignment
         self.refresh_news_btn.setFixedWidth(40)
@@ -163,7 +468,7 @@ class MainWindow(QMainWindow):
         # Character limit
         self.chars_label = QLabel("Max Characters:")
         self.chars_input = QLineEdit()
-        self.chars_input.setText('500')
+        self.chars_input.setPlaceholderText("No limit")
         bottom_layout.addWidget(self.chars_label)
         bottom_layout.addWidget(self.chars_input)
         
@@ -209,9 +514,13 @@ class MainWindow(QMainWindow):
 
         # Output area
         self.output_label = QLabel("Caption:")
-        self.output_text = QTextEdit()
-        self.output_text.setReadOnly(True)
-        bottom_layout.addWidget(self.output_label)
+        self.progress_label = QLabel("")  # Position / length of the article audio
+        self.output_text = CaptionLog()
+        output_header = QHBoxLayout()
+        output_header.addWidget(self.output_label)
+        output_header.addStretch()
+        output_header.addWidget(self.progress_label)
+        bottom_layout.addLayout(output_header)
         bottom_layout.addWidget(self.output_text)
 
         # Add sections to splitter
@@ -227,7 +536,10 @@ class MainWindow(QMainWindow):
         self.clear_button.clicked.connect(self.clear_input)
         self.exit_button.clicked.connect(self.close)
         self.refresh_news_btn.clicked.connect(self.load_news_list)
-        self.load_news_list()
+        self.prefetcher = ArticlePrefetcher()
+        self.retired_threads = set()  # Stopped SpeakingThreads still winding down
+        self.next_intro = None  # (text, lang) announced before the next article
+        self.tts_backend = TTS_BACKEND  # Speech engine, chosen by WXC_TTS_BACKEND
 
         self.original_words = []
         self.current_index = 0
@@ -237,6 +549,13 @@ class MainWindow(QMainWindow):
         self.news_articles = []  # Add this to store news list
         self.current_news_index = -1  # Add this to track current news position
 
+        # Persistent index of seen articles; show last session's list right away
+        self.article_index = ArticleIndex()
+        self.article_store = ArticleStore()  # Text of articles read in full, for search and replay
+        self.duplicates = DuplicateIndex()  # Spots the same story re-posted under another title
+        self.show_saved_news()
+        self.load_news_list()
+
         # Enable stop button only when speaking
         self.stop_button.setEnabled(False)
 
@@ -266,6 +585,14 @@ class MainWindow(QMainWindow):
         """Handle window show events"""
         self.center_window()
         super().showEvent(event)
+        if 'window' not in startup_times:
+            # Runs once the event loop has painted the window
+            QTimer.singleShot(0, self.on_window_ready)
+
+    def on_window_ready(self):
+        mark_startup('window')
+        # Load the speech pipeline in the background before the first article
+        warm_up()
 
     def clear_input(self):
         """Clear all input fields and output text."""
@@ -273,20 +600,35 @@ class MainWindow(QMainWindow):
         self.lang_combo.setCurrentIndex(0)
         self.chars_input.clear()
         self.output_text.clear()
+        self.progress_label.clear()
+
+    def retire_speaking_thread(self):
+        """Stop the speaking thread without waiting for it to wind down.
+
+        The stopped thread is kept referenced until it has exited, since
+        Qt aborts if a running QThread is garbage collected.
+        """
+        thread = getattr(self, 'speaking_thread', None)
+        if thread is None or not thread.isRunning():
+            return
+        thread.stop()
+        self.retired_threads.add(thread)
+        thread.finished.connect(lambda: self.retired_threads.discard(thread))
 
     def stop_speaking(self):
         if hasattr(self, 'speaking_thread') and self.speaking_thread.isRunning():
             self.speaking_thread.stop()
             # Save the exact position where we stopped
             self.current_index = self.speaking_thread.current_index
-            self.speaking_thread.quit()
-            self.speaking_thread.wait()
+            self.retire_speaking_thread()
             self.stop_button.setEnabled(False)
             self.show_message(f"Paused at position: {self.current_index + 1}")
             #self.current_index = self.current_index + 1 # skip the current already spoken word
 
     def process_and_speak(self):
         """Process the URL and speak the content with timing."""
+        from src.article_extractor import ArticleSegments
+        requested_at = time.perf_counter()
         # Reset pause state when starting new speech
         self.stop_button.setText("Pause")  # Reset text to default
         self.paused = False  # Clear pause flag
@@ -301,136 +643,221 @@ class MainWindow(QMainWindow):
         if not lang:  # Handle empty selection
             lang = 'en'  # Default to English
         
-        chars_limit = int(self.chars_input.text()) if self.chars_input.text() else 500
+        chars_limit = int(self.chars_input.text()) if self.chars_input.text() else 0  # 0: whole article
         
-        # Modified resume condition check
+        # Modified resume condition check; later pages may not be fetched yet
         if (url == self.original_url and
-            self.current_index < len(self.original_words)):
+            (self.current_index < len(self.original_words)
+             or not getattr(self.original_words, 'done', True))):
             
             # Force stop any existing thread
-            if hasattr(self, 'speaking_thread') and self.speaking_thread.isRunning():
-                self.speaking_thread.stop()
-                self.speaking_thread.quit()
-                self.speaking_thread.wait()
+            self.retire_speaking_thread()
             
             self.speaking_thread = SpeakingThread(
                 self.original_words,
                 lang=self.lang_combo.currentText(),
                 start_index=self.current_index,
                 get_volume=lambda: self.volume,  # Pass real-time volume getter
-                auto_detect=self.auto_detect_check.isChecked()
+                auto_detect=self.auto_detect_check.isChecked(),
+                url=url,
+                requested_at=requested_at,
+                backend=self.tts_backend,
+                duplicates=self.duplicates
             )
             self.speaking_thread.update_output_signal.connect(self.update_output)
+            self.speaking_thread.progress_signal.connect(self.update_progress)
             self.speaking_thread.finished_signal.connect(self.handle_speech_finished)
+            self.speaking_thread.extracted_signal.connect(self.save_article)
+            self.speaking_thread.duplicate_signal.connect(self.show_duplicate)
+            self.speaking_thread.failed_signal.connect(self.handle_speech_failed)
             self.speaking_thread.start()
             self.stop_button.setEnabled(True)
             return
             
-        try:
-            response = requests.get(url)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside']):
-                element.decompose()
-                
-            main_text = soup.get_text(separator='\n', strip=True)
-
-            # specific for wxc news
-            idx = main_text.find("被阅读次数")
-            if idx != -1:
-                main_text = main_text[idx+len("被阅读次数") + 8:] # skip the "被阅读次数" and the following 8 characters(A-AA+)
-            
-            if not lang:
-                try:
-                    lang = detect(main_text[:chars_limit])
-                except LangDetectException:
-                    lang = 'en'
-                    
-            speak_text = main_text[:chars_limit]
-            
-            segments = re.findall(r'[^。！？，；：、]+[。！？，；：、]?', speak_text)
-            self.original_words = [seg.strip() for seg in segments if seg.strip()]
+        # Articles read in full before come from the store, offline.
+        # Otherwise the speaking thread reads the first page, through the
+        # background prefetch if one is under way, so the window stays
+        # responsive and Pause works right away
+        stored = self.article_store.get(url)
+        original = self.duplicates.duplicate_of(url)
+        if stored is None and original is not None:
+            stored = self.article_store.get(original)  # Same story: its audio is cached already
+        if stored is not None:
+            article = ArticleSegments.from_segments(url, stored['segments'], chars_limit)
+        else:
+            article = ArticleSegments(url, chars_limit,
+                                      prefetched=self.prefetcher.take(url, chars_limit))
+        self.original_words = article
 
-            self.current_index = 0
-            self.original_url = url
-            self.original_lang = lang
-            self.original_chars_limit = chars_limit
-            
-            # Add validation before thread start
-            if not self.original_words:
-                self.show_message("Error: No text content found to speak")
-                return
-            
-            # Add thread cleanup
-            if hasattr(self, 'speaking_thread'):
-                self.speaking_thread.quit()
-            
-            self.speaking_thread = SpeakingThread(
-                self.original_words,
-                lang=lang,
-                start_index=self.current_index,
-                get_volume=lambda: self.volume,  # Pass real-time volume getter
-                auto_detect=self.auto_detect_check.isChecked()
-            )
-            self.speaking_thread.update_output_signal.connect(self.update_output)
-            self.speaking_thread.finished_signal.connect(self.handle_speech_finished)
-            self.speaking_thread.start()
-            self.stop_button.setEnabled(True)
-            
-        except requests.exceptions.RequestException as e:
-            self.show_message(f"Error fetching URL: {e}")
+        self.current_index = 0
+        self.original_url = url
+        self.original_lang = lang
+        self.original_chars_limit = chars_limit
+        
+        # Add validation before thread start
+        if self.original_words.done and not self.original_words:
+            self.show_message("Error: No text content found to speak")
+            return
+        
+        # Add thread cleanup
+        self.retire_speaking_thread()
+        intro, intro_lang = self.next_intro or (None, None)
+        self.next_intro = None
+        
+        self.speaking_thread = SpeakingThread(
+            self.original_words,
+            lang=lang,
+            start_index=self.current_index,
+            get_volume=lambda: self.volume,  # Pass real-time volume getter
+            auto_detect=self.auto_detect_check.isChecked(),
+            url=url,
+            requested_at=requested_at,
+            backend=self.tts_backend,
+            intro=intro,
+            intro_lang=intro_lang,
+            duplicates=self.duplicates,
+            # Only Auto Continue passes over repeats; a clicked article is always read
+            skip_duplicate=self.is_heard if intro is not None and NEAR_DUP_SKIP else None
+        )
+        self.speaking_thread.update_output_signal.connect(self.update_output)
+        self.speaking_thread.progress_signal.connect(self.update_progress)
+        self.speaking_thread.finished_signal.connect(self.handle_speech_finished)
+        self.speaking_thread.extracted_signal.connect(self.save_article)
+        self.speaking_thread.duplicate_signal.connect(self.show_duplicate)
+        self.speaking_thread.first_page_signal.connect(self.article_index.mark_extracted)
+        self.speaking_thread.failed_signal.connect(self.handle_speech_failed)
+        self.speaking_thread.start()
+        self.stop_button.setEnabled(True)
+        self.prefetch_next_articles(chars_limit)
             
+    def prefetch_next_articles(self, chars_limit):
+        """Prepare the articles Auto Continue will read next"""
+        if (self.auto_continue_check.isChecked()
+            and self.current_news_index != -1):
+            upcoming = self.news_articles[self.current_news_index + 1:
+                                          self.current_news_index + 1 + self.prefetcher.depth]
+            # Articles extracted before already have their audio cached
+            upcoming = [a for a in upcoming if not self.article_index.is_extracted(a['url'])
+                        and not self.is_heard_repeat(a['url'])]
+            self.prefetcher.prefetch(upcoming, chars_limit)
+
     def update_output(self, message):
-        self.output_text.setReadOnly(False)
-        cursor = self.output_text.textCursor()
-        cursor.movePosition(QTextCursor.End)
-        self.output_text.setTextCursor(cursor)
-        # Add error message filtering
-        if "Speech Error" in message:
-            self.output_text.setTextColor(QColor(255, 0, 0))  # Red text for errors
-        else:
-            self.output_text.setTextColor(QColor(0, 0, 0))  # Black text otherwise
-        self.output_text.append(message)
-        self.output_text.verticalScrollBar().setValue(self.output_text.verticalScrollBar().maximum())
-        self.output_text.setReadOnly(True)  # Re-enable read-only after update
+        self.output_text.add_line(message, error="Speech Error" in message)  # Red text for errors
+
+    def update_progress(self, position, total):
+        """Show how far into the article audio we are and how much is left"""
+        self.progress_label.setText(
+            f"{format_seconds(position)} / {format_seconds(total)} "
+            f"({format_seconds(total - position)} left)")
 
     def load_news_list(self):
         """Load and display news in the text area"""
-        self.news_display.clear()
-        self.news_display.append("Loading news...")
+        if not self.news_articles:
+            self.news_display.clear()
+            self.news_display.append("Loading news...")
+        else:
+            self.news_label.setText("Latest News (refreshing...):")  # Saved list shown meanwhile
         
         # Run news fetching in a thread to prevent UI freeze
         self.news_thread = NewsFetcherThread()
         self.news_thread.news_fetched.connect(self.update_news_display)
         self.news_thread.start()
 
-    def update_news_display(self, articles):
-        """Update display with formatted news list"""
+    def news_item_html(self, idx, article, new=False):
+        """One line of the news list; read articles are greyed out"""
+        state = self.article_index.state(article['url'])
+        color = 'gray' if state and state['read'] else 'blue'
+        marker = " <b style='color:red;'>NEW</b>" if new else ""
+        if self.duplicates.duplicate_of(article['url']):
+            marker += " <span style='color:gray;'>(repeat)</span>"
+        return (f"{idx}. <a href='{article['url']}' style='text-decoration:none; color:{color};'>"
+                f"{article['title']}</a>{marker}")
+
+    def show_saved_news(self):
+        """Show the list from the last session until a refresh comes in"""
+        articles = [{'title': a['title'], 'url': a['url']} for a in self.article_index.latest()]
+        if articles:
+            self.render_news_list(articles)
+            mark_startup('news_list', source='saved')
+
+    def search_articles(self):
+        """Show the stored articles matching the search box; click one to replay it"""
+        query = self.search_input.text().strip()
+        if not query:
+            self.show_saved_news()
+            return
+        results = self.article_store.search(query)
+        self.news_display.clear()
+        self.news_articles = results  # Auto Continue goes through the results
+        if not results:
+            self.news_display.append(f"No saved articles match \"{html.escape(query)}\"")
+        for idx, result in enumerate(results, 1):
+            self.news_display.append(self.news_item_html(idx, result))
+            self.news_display.append(f"<span style='color:gray;'>{html.escape(result['snippet'])}</span>")
+        self.news_display.moveCursor(QTextCursor.Start)
+
+    def is_heard(self, url):
+        """True once the article has been read to the end (safe from any thread)"""
+        state = self.article_index.state(url)
+        return bool(state and state['read'])
+
+    def is_heard_repeat(self, url):
+        """True for a known repeat of a story already read"""
+        original = self.duplicates.duplicate_of(url)
+        return NEAR_DUP_SKIP and original is not None and self.is_heard(original)
+
+    def show_duplicate(self, original, skipped):
+        title = next((a['title'] for a in self.news_articles if a['url'] == original), original)
+        self.show_message(f"{'Skipping repeat' if skipped else 'Repeat'} of: {title}")
+
+    def save_article(self, article):
+        """Keep a fully extracted article for search and offline replay"""
+        title = next((a['title'] for a in self.news_articles if a['url'] == article['url']), article['url'])
+        self.article_store.save(article['url'], title, article['segments'], article['lang'])
+
+    def render_news_list(self, articles):
         self.news_display.clear()
         self.news_articles = articles  # Store the articles list
         for idx, article in enumerate(articles, 1):
-            self.news_display.append(
-                f"{idx}. <a href='{article['url']}' style='text-decoration:none; color:blue;'>"
-                f"{article['title']}</a>"
-            )
+            self.news_display.append(self.news_item_html(idx, article))
         self.news_display.moveCursor(QTextCursor.Start)
 
+    def update_news_display(self, articles):
+        """Merge a fresh listing, appending only articles not shown yet"""
+        self.news_label.setText("Latest News:")
+        mark_startup('news_refreshed')
+        if not articles:
+            if not self.news_articles:
+                self.news_display.clear()
+            return
+        new_articles = self.article_index.merge(articles)
+        # Stories gone from the site are not worth keeping prepared
+        self.prefetcher.retain(article['url'] for article in articles)
+        if self.search_input.text().strip():
+            return  # Search results stay up; the list is shown once the search is cleared
+        if not self.news_articles:
+            self.render_news_list(articles)
+            mark_startup('news_list', source='live')
+            return
+
+        shown = {article['url'] for article in self.news_articles}
+        added = [article for article in articles if article['url'] not in shown]
+        new_urls = {article['url'] for article in new_articles}
+        for article in added:
+            self.news_articles.append(article)
+            self.news_display.append(
+                self.news_item_html(len(self.news_articles), article, new=article['url'] in new_urls))
+        if added:
+            self.show_message(f"{len(added)} new articles")
+
     def on_news_clicked(self, url):
         """Handle news link clicks"""
         was_speaking = False
         # Stop any ongoing speech
         if hasattr(self, 'speaking_thread') and self.speaking_thread.isRunning():
             was_speaking = True
-            self.stop_speaking()
-            self.show_message("Interrupting current speech...")
-            self.speaking_thread.wait(2000)  # Wait up to 2 seconds
-            if self.speaking_thread.isRunning():  # Force terminate if still running
-                self.speaking_thread.terminate()
-                self.speaking_thread.wait()
-                self.show_message("Speech stopped forcefully!")
-            else:
-                self.show_message("Speech interrupted successfully")
+            self.stop_speaking()  # Silences playback at once; no need to wait
+            self.show_message("Speech interrupted")
         
         # Reset state variables
         self.current_index = 0
@@ -460,12 +887,7 @@ class MainWindow(QMainWindow):
 
     def show_message(self, message):
         """Display messages in the output area"""
-        self.output_text.setReadOnly(False)
-        self.output_text.append(message)
-        self.output_text.verticalScrollBar().setValue(
-            self.output_text.verticalScrollBar().maximum()
-        )
-        self.output_text.setReadOnly(True)
+        self.output_text.add_line(message)
 
     def increase_font_size(self):
         self.font_size = min(24, self.font_size + 2)
@@ -486,6 +908,7 @@ class MainWindow(QMainWindow):
             self.output_text,
             self.news_label,
             self.output_label,
+            self.progress_label,
             self.url_label,
             self.url_input,
             self.lang_label,
@@ -500,6 +923,7 @@ class MainWindow(QMainWindow):
             self.clear_button,
             self.exit_button,
             self.refresh_news_btn,
+            self.search_input,
         ]
         
         for widget in widgets_to_update:
@@ -522,7 +946,13 @@ class MainWindow(QMainWindow):
         self.show_message(f"Volume: {self.volume}%")
         # Add actual volume control implementation here
 
+    def handle_speech_failed(self):
+        self.stop_button.setEnabled(False)  # Nothing is playing to pause
+
     def handle_speech_finished(self):
+        if self.stop_button.isEnabled() and self.original_url:
+            self.article_index.mark_read(self.original_url)  # Finished, not paused
+
         # Only auto-continue if we naturally finished speaking all text
         if (self.auto_continue_check.isChecked() 
             and self.current_news_index != -1
@@ -530,8 +960,12 @@ class MainWindow(QMainWindow):
             and self.stop_button.isEnabled() == True):
             #and self.current_index >= len(self.original_words)):  # bug: has to disable here
             
-            # Move to next article
+            # Move to next article, passing over stories already heard under another title
             next_index = self.current_news_index + 1
+            while (next_index < len(self.news_articles) - 1
+                   and self.is_heard_repeat(self.news_articles[next_index]['url'])):
+                self.show_message(f"Skipping repeat: {self.news_articles[next_index]['title']}")
+                next_index += 1
             next_article = self.news_articles[next_index]
             
             # Reset state BEFORE processing next article
@@ -546,29 +980,26 @@ class MainWindow(QMainWindow):
             # Speak the title first
             title = next_article['title']
             if self.auto_detect_check.isChecked():
-                clean_title = clean_text_for_detection(title)
-                detected_lang = detect_language(clean_title)
-                lang = normalize_lang_code(detected_lang)
-                if lang not in ['en', 'zh-cn']:  # Match SpeakingThread's fallback
-                    lang = 'zh-cn'
+                from src.text_to_speech_online import resolve_lang
+                lang = resolve_lang(title)  # Same wxc fallback as SpeakingThread, memoized
             else:
                 lang = self.lang_combo.currentText() or 'en'
 
-            speak(f"Next article: {title}", lang=lang, volume=self.volume)
-            
-            # Add brief delay before content starts
-            time.sleep(0.5)  # 500ms pause after title
+            # Spoken by the next SpeakingThread, so Pause can cut it short too
+            self.next_intro = (f"Next article: {title}", lang)
             
             self.url_input.setText(next_article['url'])
             self.process_and_speak()
 
 def main():
+    start_metrics_server()
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    start_metrics_server()
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
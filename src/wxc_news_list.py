@@ -1,26 +1,17 @@
-import os
 import requests
 from bs4 import BeautifulSoup
+from src.config import BASE_URL
+from src.http_client import fetch_text
 
 def get_wenxuecity_news():
-    url = "https://www.wenxuecity.com/"
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-
-      # Add proxy configuration
-    proxies = {
-        'http': os.environ.get('HTTP_PROXY'),
-        'https': os.environ.get('HTTPS_PROXY')
-    } if any(os.environ.get(k) for k in ['HTTP_PROXY', 'HTTPS_PROXY']) else None
-   
+    url = f"{BASE_URL}/"
     articles = []
     
     try:
-        response = requests.get(url, headers=headers, proxies=proxies)
-        response.raise_for_status()
+        # Shared keep-alive client; an unchanged homepage comes back as a 304
+        html = fetch_text(url)
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(html, 'html.parser')
         
         # Target news links in the main content area
         news_links = soup.select('div.maincontent a[href^="/news/"][href$=".html"]')
@@ -31,7 +22,7 @@ def get_wenxuecity_news():
             
             # Handle relative URLs
             if not url.startswith('http'):
-                url = f'https://www.wenxuecity.com{url}'
+                url = f'{BASE_URL}{url}'
                 
             articles.append({
                 'title': title,
@@ -15,6 +15,7 @@ a = Analysis(
         'fasttext',
         'gtts',
         'langdetect',
+        'miniaudio',
         'PyQt5.QtPrintSupport'
     ],
     hookspath=[],